@@ -1,51 +1,199 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import logging
+import threading
+
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 from ...db.database import get_db
 from ...db import models, schemas
-from ...langgraph_agent.intelligent_agent import process_intelligent_user_input # Import the intelligent agent function
+from ...langgraph_agent.intelligent_agent import process_intelligent_user_input, stream_intelligent_user_input # Import the intelligent agent functions
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Rows per multi-row INSERT in the bulk endpoint (1000 x ~12 columns stays well
+# under PostgreSQL's 32767 bind-parameter cap)
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# Short-lived cache of HCP interaction pages keyed by (name prefix, limit, offset).
+# Writes through this API invalidate the affected names; edits made by the agent
+# tools age out with the TTL.
+_hcp_interactions_cache = TTLCache(maxsize=1024, ttl=30)
+_hcp_interactions_cache_lock = threading.Lock()
+
+def _invalidate_hcp_interactions(hcp_name: Optional[str] = None):
+    """Drop cached pages whose prefix matches hcp_name (or everything when None)"""
+    with _hcp_interactions_cache_lock:
+        if hcp_name is None:
+            _hcp_interactions_cache.clear()
+            return
+        name = hcp_name.lower()
+        for key in [key for key in _hcp_interactions_cache if name.startswith(key[0])]:
+            _hcp_interactions_cache.pop(key, None)
+
+def _like_prefix(term: str) -> str:
+    """LIKE pattern matching values that start with term, with wildcards in term escaped"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
 class ChatInput(BaseModel):
     message: str
     form_data: dict = None  # Optional form data for form information tool
 
+class ChatResponse(BaseModel):
+    # Declared so FastAPI serializes /chat through pydantic-core instead of stdlib json
+    response_type: Optional[str] = None
+    message: Optional[str] = None
+    field_updates: Optional[List[Dict[str, Any]]] = None
+    field: Optional[str] = None
+    value: Optional[Any] = None
+
+def _with_interaction_at(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Swap the API's separate date and time fields for the interaction_at column"""
+    values["interaction_at"] = models.interaction_timestamp(
+        values.pop("interaction_date"), values.pop("interaction_time", None)
+    )
+    return values
+
 @router.post("/interactions/log", response_model=schemas.Interaction)
-def log_interaction(interaction: schemas.InteractionCreate, db: Session = Depends(get_db)):
-    print(f"Received interaction data: {interaction.dict()}")
+async def log_interaction(interaction: schemas.InteractionCreate, db: AsyncSession = Depends(get_db)):
     try:
-        db_interaction = models.Interaction(**interaction.dict())
-        db.add(db_interaction)
-        db.commit()
-        db.refresh(db_interaction)
-        print(f"Successfully added interaction with ID: {db_interaction.id}")
+        # INSERT ... RETURNING hands back id and server defaults in the same round-trip
+        result = await db.execute(
+            insert(models.Interaction)
+            .values(**_with_interaction_at(interaction.model_dump()))
+            .returning(models.Interaction)
+        )
+        db_interaction = result.scalar_one()
+        await db.commit()
+        _invalidate_hcp_interactions(db_interaction.hcp_name)
         return db_interaction
     except Exception as e:
-        db.rollback()
-        print(f"Error logging interaction: {e}")
+        await db.rollback()
+        logger.error("Error logging interaction: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to log interaction: {str(e)}")
 
+@router.post("/interactions/log/bulk", response_model=List[int])
+async def log_interactions_bulk(interactions: List[schemas.InteractionCreate], db: AsyncSession = Depends(get_db)):
+    """Log many interactions in one transaction and return their ids in request order"""
+    rows = [_with_interaction_at(interaction.model_dump()) for interaction in interactions]
+    stmt = insert(models.Interaction).returning(models.Interaction.id, sort_by_parameter_order=True)
+    ids: List[int] = []
+    try:
+        # Multi-row INSERTs, chunked to stay under the driver's bound-parameter limit
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            result = await db.execute(stmt, rows[start:start + BULK_INSERT_CHUNK_SIZE])
+            ids.extend(result.scalars())
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error bulk logging interactions: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to log interactions: {str(e)}")
+    for hcp_name in {row["hcp_name"] for row in rows}:
+        _invalidate_hcp_interactions(hcp_name)
+    return ids
+
 @router.put("/interactions/{interaction_id}", response_model=schemas.Interaction)
-def update_interaction(interaction_id: int, interaction: schemas.InteractionUpdate, db: Session = Depends(get_db)):
-    db_interaction = db.query(models.Interaction).filter(models.Interaction.id == interaction_id).first()
+async def update_interaction(interaction_id: int, interaction: schemas.InteractionUpdate, db: AsyncSession = Depends(get_db)):
+    values = interaction.model_dump(exclude_unset=True)
+    if "interaction_date" in values or "interaction_time" in values:
+        # Date and time share one column, so a partial change keeps the other half as stored
+        if values.get("interaction_date") is None or "interaction_time" not in values:
+            current = await db.get(models.Interaction, interaction_id)
+            if not current:
+                raise HTTPException(status_code=404, detail="Interaction not found")
+            if values.get("interaction_date") is None:
+                values["interaction_date"] = current.interaction_date
+            values.setdefault("interaction_time", current.interaction_time)
+        values = _with_interaction_at(values)
+    if values:
+        # Single UPDATE ... RETURNING round-trip instead of load, setattr, commit, refresh
+        stmt = (
+            update(models.Interaction)
+            .where(models.Interaction.id == interaction_id)
+            .values(**values)
+            .returning(models.Interaction)
+        )
+    else:
+        stmt = select(models.Interaction).where(models.Interaction.id == interaction_id)
+    result = await db.execute(stmt)
+    db_interaction = result.scalar_one_or_none()
     if not db_interaction:
         raise HTTPException(status_code=404, detail="Interaction not found")
-    for key, value in interaction.dict(exclude_unset=True).items():
-        setattr(db_interaction, key, value)
-    db.commit()
-    db.refresh(db_interaction)
+    await db.commit()
+    # A rename can move the row out of cached searches for its old name
+    _invalidate_hcp_interactions(None if "hcp_name" in values else db_interaction.hcp_name)
     return db_interaction
 
-@router.get("/interactions/hcp/{hcp_name}", response_model=List[schemas.Interaction])
-def get_interactions_for_hcp(hcp_name: str, db: Session = Depends(get_db)):
-    interactions = db.query(models.Interaction).filter(models.Interaction.hcp_name.ilike(f"%{hcp_name}%")).all()
+@router.get("/interactions/hcp/{hcp_name}", response_model=List[schemas.InteractionSummary])
+async def get_interactions_for_hcp(
+    hcp_name: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Most recent interactions whose name starts with hcp_name, one page at a time"""
+    search_term = hcp_name.lower().strip()
+    cache_key = (search_term, limit, offset)
+    with _hcp_interactions_cache_lock:
+        cached = _hcp_interactions_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    result = await db.execute(
+        select(models.Interaction)
+        .options(load_only(
+            models.Interaction.id,
+            models.Interaction.hcp_name,
+            models.Interaction.interaction_at,
+            models.Interaction.interaction_type,
+            models.Interaction.sentiment,
+        ))
+        .where(models.Interaction.hcp_name_lc.like(_like_prefix(search_term), escape="\\"))
+        .order_by(models.Interaction.interaction_at.desc(), models.Interaction.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    interactions = [schemas.InteractionSummary.model_validate(row) for row in result.scalars()]
+    with _hcp_interactions_cache_lock:
+        _hcp_interactions_cache[cache_key] = interactions
     return interactions
 
-@router.post("/chat")
-async def chat_with_agent(chat_input: ChatInput, db: Session = Depends(get_db)):
+def _build_form_populate(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "response_type": "FORM_POPULATE",
+        "field_updates": result.get("field_updates", []),
+        "message": result.get("message", "Form populated successfully")
+    }
+
+def _build_form_update(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "response_type": "FORM_UPDATE",
+        "field": result.get("field"),
+        "value": result.get("value"),
+        "message": result.get("message")
+    }
+
+def _build_error(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {"response_type": "ERROR", "message": result.get("message")}
+
+# Agent response types the frontend handles specially; anything else is a plain message
+RESPONSE_HANDLERS = {
+    "FORM_POPULATE": _build_form_populate,
+    "FORM_UPDATE": _build_form_update,
+    "ERROR": _build_error,
+}
+
+@router.post("/chat", response_model=ChatResponse, response_model_exclude_none=True)
+async def chat_with_agent(chat_input: ChatInput):
     """
     Intelligent chat endpoint using LLM-based decision making.
     
@@ -65,67 +213,20 @@ async def chat_with_agent(chat_input: ChatInput, db: Session = Depends(get_db)):
     The agent thinks before acting - just describe what you want naturally!
     """
     try:
-        # Use the intelligent agent function with form data
-        result = process_intelligent_user_input(chat_input.message, chat_input.form_data)
-        
-        print(f"DEBUG - Backend API received result: {result}")
-        
-        # Try to parse the result as JSON first (from intelligent agent)
-        try:
-            import json
-            result_data = json.loads(result)
-            
-            print(f"DEBUG - Parsed JSON result: {result_data}")
-            
-            if result_data.get("response_type") == "FORM_POPULATE":
-                response = {
-                    "response_type": "FORM_POPULATE",
-                    "field_updates": result_data.get("field_updates", []),
-                    "message": result_data.get("message", "Form populated successfully")
-                }
-                print(f"DEBUG - Returning FORM_POPULATE response: {response}")
-                return response
-            elif result_data.get("response_type") == "FORM_UPDATE":
-                return {
-                    "response_type": "FORM_UPDATE",
-                    "field": result_data.get("field"),
-                    "value": result_data.get("value"),
-                    "message": result_data.get("message")
-                }
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"DEBUG - JSON parsing failed: {e}")
-            # Not a JSON response, continue with string matching
-            pass
+        # The agent awaits its Groq round-trips, so other requests are served meanwhile
+        result = await process_intelligent_user_input(chat_input.message, chat_input.form_data)
         
-        # Check if this is a form populate response
-        if "Perfect! I've populated the form" in result or "Great! I've populated the form" in result:
-            # This is a form populate response, return special response type
-            return {
-                "response_type": "FORM_POPULATE",
-                "message": result
-            }
+        logger.debug("Backend API received result: %s", result)
         
-        # Check if this is a form update response (looking for specific patterns)
-        if "Perfect! I've updated the" in result and "in the form" in result:
-            # This is a form update response, try to extract the field and value
-            try:
-                import re
-                match = re.search(r"updated the (\w+) to '([^']+)' in the form", result)
-                if match:
-                    return {
-                        "response_type": "FORM_UPDATE",
-                        "field": match.group(1),
-                        "value": match.group(2),
-                        "message": result
-                    }
-            except:
-                pass
+        handler = RESPONSE_HANDLERS.get(result["response_type"])
+        if handler:
+            return handler(result)
         
         # Return the agent's response
-        return {"message": result}
+        return {"message": result["message"]}
         
     except Exception as e:
-        print(f"Error in intelligent LangGraph agent: {e}")
+        logger.error("Error in intelligent LangGraph agent: %s", e)
         # Fallback to basic response if agent fails
         return {
             "message": "I'm your Intelligent AI Sales Assistant with LLM-based decision making:\n\n"
@@ -141,4 +242,28 @@ async def chat_with_agent(chat_input: ChatInput, db: Session = Depends(get_db)):
                       "• 'Analyze my performance this month'\n"
                       "• 'What's currently in the form?'\n"
                       "• 'I had a great call with Dr. Martinez yesterday'"
-        }
\ No newline at end of file
+        }
+@router.post("/chat/stream")
+async def stream_chat_with_agent(chat_input: ChatInput):
+    """
+    Streaming variant of /chat, answered as newline-delimited JSON.
+    
+    General conversation replies arrive as a series of MESSAGE_CHUNK events while the
+    model is still writing; every other request produces one event shaped like a /chat
+    response.
+    """
+    async def events():
+        try:
+            async for result in stream_intelligent_user_input(chat_input.message, chat_input.form_data):
+                handler = RESPONSE_HANDLERS.get(result["response_type"])
+                payload = handler(result) if handler else result
+                yield orjson.dumps({key: value for key, value in payload.items() if value is not None}) + b"\n"
+        except Exception as e:
+            # The 200 status has already gone out, so the failure is reported in-band
+            logger.error("Error in streaming LangGraph agent: %s", e)
+            yield orjson.dumps({
+                "response_type": "ERROR",
+                "message": f"I encountered an error while processing your request: {str(e)}",
+            }) + b"\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -1,18 +1,49 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from ..core.config import settings
+from ..core.config import get_settings
+
+settings = get_settings()
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Pooled connections are pinged before use and recycled ahead of server-side timeouts
+ENGINE_OPTIONS = {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": True,
+}
+
+# Async drivers used by the API endpoints for each sync driver in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """Translate a sync DATABASE_URL into its async driver equivalent"""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+# Sync engine: table creation and the LangGraph tools
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **ENGINE_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Thread-local sessions for the tools, which run in worker threads. Closing one hands its
+# connection back to the pool, and the thread reuses the same session on its next call
+ScopedSession = scoped_session(SessionLocal)
+
+# Async engine: FastAPI endpoints, so DB waits yield the event loop
+async_engine = create_async_engine(get_async_database_url(SQLALCHEMY_DATABASE_URL), **ENGINE_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
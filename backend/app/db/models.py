@@ -1,17 +1,35 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date, TIMESTAMP
+from datetime import date, datetime, time, timezone
+from typing import Optional
+
+from sqlalchemy import create_engine, Column, Computed, Integer, String, Text, TIMESTAMP, DDL, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
-from ..core.config import settings
 
 Base = declarative_base()
 
 class Interaction(Base):
     __tablename__ = "interactions"
+    __table_args__ = (
+        # btree over the lowercased name serves the API's prefix searches;
+        # text_pattern_ops lets LIKE 'prefix%' use it under any collation
+        Index(
+            "ix_interactions_hcp_name_lc",
+            "hcp_name_lc",
+            postgresql_ops={"hcp_name_lc": "text_pattern_ops"},
+        ),
+        # Trigram index so the agent tools' ILIKE '%name%' lookups avoid a sequential scan
+        Index(
+            "ix_interactions_hcp_name_trgm",
+            "hcp_name",
+            postgresql_using="gin",
+            postgresql_ops={"hcp_name": "gin_trgm_ops"},
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     hcp_name = Column(String(255), nullable=False)  # Direct HCP name field
-    interaction_date = Column(Date, nullable=False)
-    interaction_time = Column(String(10))  # Store time as HH:MM format
+    hcp_name_lc = Column(String(255), Computed("lower(hcp_name)", persisted=True))  # Maintained by the database
+    interaction_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)  # Stored in UTC
     interaction_type = Column(String(100))
     attendees = Column(Text)  # Who attended the meeting
     summary = Column(Text)  # Outcomes/results
@@ -22,3 +40,30 @@ class Interaction(Base):
     follow_up_actions = Column(Text)  # Next steps planned
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # The API still speaks in a separate date and HH:MM time, derived from interaction_at
+    @property
+    def interaction_date(self) -> Optional[date]:
+        return _as_utc(self.interaction_at).date() if self.interaction_at else None
+
+    @property
+    def interaction_time(self) -> Optional[str]:
+        return _as_utc(self.interaction_at).strftime("%H:%M") if self.interaction_at else None
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is written as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def interaction_timestamp(interaction_date: date, interaction_time: Optional[str] = None) -> datetime:
+    """Combine a date and an optional HH:MM time into the UTC value stored in interaction_at"""
+    parsed_time = datetime.strptime(interaction_time, "%H:%M").time() if interaction_time else time.min
+    return datetime.combine(interaction_date, parsed_time, tzinfo=timezone.utc)
+
+# gin_trgm_ops needs the pg_trgm extension before the table (and its indexes) is created
+event.listen(
+    Interaction.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
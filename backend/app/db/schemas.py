@@ -1,11 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date, datetime
 from typing import Optional
 
+# HH:MM, or empty when the form leaves the time blank
+TIME_PATTERN = r"^(([01]?\d|2[0-3]):[0-5]\d)?$"
+
 class InteractionBase(BaseModel):
     hcp_name: str
     interaction_date: date
-    interaction_time: Optional[str] = None
+    interaction_time: Optional[str] = Field(None, pattern=TIME_PATTERN)
     interaction_type: Optional[str] = None
     attendees: Optional[str] = None
     summary: Optional[str] = None
@@ -21,7 +24,7 @@ class InteractionCreate(InteractionBase):
 class InteractionUpdate(BaseModel):
     hcp_name: Optional[str] = None
     interaction_date: Optional[date] = None
-    interaction_time: Optional[str] = None
+    interaction_time: Optional[str] = Field(None, pattern=TIME_PATTERN)
     interaction_type: Optional[str] = None
     attendees: Optional[str] = None
     summary: Optional[str] = None
@@ -33,8 +36,18 @@ class InteractionUpdate(BaseModel):
 
 class Interaction(InteractionBase):
     id: int
+    interaction_at: datetime
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class InteractionSummary(BaseModel):
+    """Lightweight row for interaction lists - the large text fields are left out"""
+    id: int
+    hcp_name: str
+    interaction_date: date
+    interaction_type: Optional[str] = None
+    sentiment: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,11 +1,11 @@
-from langchain_core.messages import BaseMessage, FunctionMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import BaseMessage, FunctionMessage, HumanMessage
 from langchain_groq import ChatGroq
 from langgraph.graph import END, StateGraph
-from typing import Literal, TypedDict
+from typing import Awaitable, Callable, Dict, Final, List, NamedTuple, Optional, Tuple, TypedDict
 from typing_extensions import Annotated
 from langgraph.graph.message import add_messages
-import json
+from functools import lru_cache, partial
+import asyncio
 import re
 
 # Import the 6 core tools
@@ -17,93 +17,134 @@ from .tools import (
     get_interaction_history,   # Tool 4: Get Interaction History
     generate_sales_insights    # Tool 5: Generate Sales Insights
 )
-from ..core.config import settings
+from ..core.config import get_settings
 
-def _make_response_conversational(tool_result: str, user_input: str, tool_name: str) -> str:
-    """
-    Convert technical tool responses into more natural, conversational responses.
-    """
-    # Handle different tool responses
-    if tool_name == "log_interaction":
-        if "✅" in tool_result:
-            return f"Great! I've successfully logged your interaction. {tool_result.replace('✅', '').strip()}"
-        elif "❌" in tool_result:
-            return f"I encountered an issue while logging your interaction. {tool_result.replace('❌', '').strip()}"
-    
-    elif tool_name == "edit_interaction" or tool_name == "edit_interaction_by_name":
-        if "✅" in tool_result:
-            return f"Perfect! I've updated the interaction as requested. {tool_result.replace('✅', '').strip()}"
-        elif "Multiple interactions found" in tool_result:
-            return f"I found several interactions for that person. Here are your options:\n\n{tool_result}"
-        elif "No interactions found" in tool_result:
-            return f"I couldn't find any interactions matching your request. {tool_result}"
-        elif "❌" in tool_result:
-            return f"I had trouble updating the interaction. {tool_result.replace('❌', '').strip()}"
-    
-    elif tool_name == "update_form_field":
-        if "✅" in tool_result:
-            return f"Done! I've updated the form field for you. {tool_result.replace('✅', '').strip()}"
-        elif "❌" in tool_result:
-            return f"I couldn't update that field. {tool_result.replace('❌', '').strip()}"
-    
-    elif tool_name == "get_interaction_history":
-        if "No interactions found" in tool_result:
-            return f"I couldn't find any interaction history for that person. {tool_result}"
-        elif "❌" in tool_result:
-            return f"I had trouble retrieving the interaction history. {tool_result.replace('❌', '').strip()}"
-        else:
-            return f"Here's the interaction history you requested:\n\n{tool_result}"
-    
-    elif tool_name == "generate_sales_insights":
-        if "❌" in tool_result:
-            return f"I couldn't generate the sales insights right now. {tool_result.replace('❌', '').strip()}"
-        else:
-            return f"Here are the sales insights based on your request:\n\n{tool_result}"
-    
-    elif tool_name == "error":
-        return f"I'm not sure how to help with that. {tool_result.replace('❌', '').strip()}"
-    
-    # Default: return the original response for any unhandled cases
-    return tool_result
+# Read once; later lookups are plain module-global reads
+_GROQ_API_KEY: Final[Optional[str]] = get_settings().groq_api_key
 
-def _handle_general_conversation(user_input: str) -> str:
-    """
-    Handle general conversation like a friendly chatbot.
-    """
-    user_lower = user_input.lower().strip()
-    
-    # First check for specific CRM/business questions (higher priority)
-    # CRM workflow and functionality questions
-    if any(phrase in user_lower for phrase in ["doctor visit", "planned visit", "call planning", "visit planning"]):
-        return "Excellent question about visit planning! In HCP CRM systems, planned doctor visits are optimized through:\n\n• Call Planning: Schedule visits based on HCP preferences and availability\n• Pre-visit Preparation: System generates briefing with HCP history, recent interactions, and relevant talking points\n• Content Recommendations: AI suggests materials based on HCP specialty, interests, and previous engagement\n• Territory Management: Optimizes routing and scheduling for maximum efficiency\n• Compliance Checks: Ensures all planned activities meet regulatory requirements\n\nThe system uses AI to analyze HCP profiles, interaction history, and current campaigns to recommend the most relevant approach for each visit. What specific aspect of visit planning interests you most?"
-    
-    elif any(phrase in user_lower for phrase in ["crm suggest", "content suggest", "recommend content", "suggest content"]):
-        return "Great question about content recommendations! The CRM uses AI to suggest relevant content through:\n\n• HCP Profiling: Analyzes specialty, interests, and previous content engagement\n• Interaction History: Reviews past discussions and materials that resonated\n• Campaign Alignment: Matches current marketing campaigns with HCP interests\n• Therapeutic Area Mapping: Suggests content based on HCP's medical specialties\n• Engagement Analytics: Recommends content with highest engagement rates\n• Compliance Filtering: Ensures all suggested content is approved for the specific HCP\n\nFor example, if visiting a cardiologist who previously engaged with heart failure content, the system would suggest the latest cardiac research, product updates, and relevant case studies. Would you like more details about any specific aspect?"
-    
-    # Specific CRM functionality questions
-    elif any(phrase in user_lower for phrase in ["content section", "digital content", "brochures", "pdfs", "content management"]):
-        return "Great question about content management! In a typical HCP CRM, the content section manages digital materials like brochures, PDFs, and educational content. Here's how it works:\n\n• Content Library: Stores approved materials by therapeutic area\n• HCP Profiling: Tracks content preferences and engagement\n• Smart Recommendations: Suggests relevant content based on HCP specialty and previous interactions\n• Usage Analytics: Monitors which materials are most effective\n• Compliance: Ensures all content is medically and legally approved\n\nFor planned visits, the system would analyze the HCP's specialty, previous interactions, and current campaigns to suggest the most relevant materials. Would you like to know more about any specific aspect?"
-    
-    # Then check for simple greetings (lower priority)
-    elif any(greeting in user_lower for greeting in ["hello", "hi", "hey"]) and len(user_input.split()) <= 3:
-        return "Hi! How are you doing today? 😊"
-    
-    elif any(greeting in user_lower for greeting in ["good morning"]) and len(user_input.split()) <= 3:
-        return "Good morning! Hope you're having a great day! ☀️"
-    
-    elif any(greeting in user_lower for greeting in ["good afternoon"]) and len(user_input.split()) <= 3:
-        return "Good afternoon! How's your day going? 🌤️"
-    
-    elif any(greeting in user_lower for greeting in ["good evening"]) and len(user_input.split()) <= 3:
-        return "Good evening! Hope you had a productive day! 🌙"
-    
-    # How are you patterns
-    elif any(phrase in user_lower for phrase in ["how are you", "how you doing", "what's up", "how's it going"]):
-        return "I'm doing great, thanks for asking! I'm here and ready to help with your HCP interactions. How about you? How's your day going?"
-    
-    # Help patterns
-    elif any(help_word in user_lower for help_word in ["help", "what can you do", "how do i", "commands"]):
-        return """I can help you with several HCP interaction tasks! Here's what I can do:
+class RouteInfo(NamedTuple):
+    """Where a message goes: the tool name plus its parsed params (or an error message)"""
+    tool: str
+    params: Optional[dict] = None
+    message: Optional[str] = None
+
+# Conversation needs no params; the message itself travels in the graph state
+_GENERAL_ROUTE: Final = RouteInfo("general_conversation")
+
+# Precompiled once at import; the routing helpers below run on every message
+# Field-update patterns in priority order, each keyed by the keyword it is anchored on
+_FIELD_PATTERNS = [
+    (keyword, re.compile(pattern, re.IGNORECASE), field_name)
+    for keyword, pattern, field_name in (
+        ("time", r"(?:change|set|update)?\s*(?:the\s+)?time\s+(?:to\s+)?(.+)", "interaction_time"),
+        ("date", r"(?:change|set|update)?\s*(?:the\s+)?date\s+(?:to\s+)?(.+)", "interaction_date"),
+        ("sentiment", r"(?:change|set|update)?\s*(?:the\s+)?sentiment\s+(?:to\s+)?(.+)", "sentiment"),
+        ("type", r"(?:change|set|update)?\s*(?:the\s+)?(?:interaction\s+)?type\s+(?:to\s+)?(.+)", "interaction_type"),
+        ("attendees", r"(?:change|set|update)?\s*(?:the\s+)?attendees\s+(?:to\s+)?(.+)", "attendees"),
+        ("summary", r"(?:change|set|update)?\s*(?:the\s+)?summary\s+(?:to\s+)?(.+)", "summary"),
+        ("discussion", r"(?:change|set|update)?\s*(?:the\s+)?(?:key\s+)?discussion\s+(?:points\s+)?(?:to\s+)?(.+)", "key_discussion_points"),
+        ("materials", r"(?:change|set|update)?\s*(?:the\s+)?materials\s+(?:shared\s+)?(?:to\s+)?(.+)", "materials_shared"),
+        ("samples", r"(?:change|set|update)?\s*(?:the\s+)?samples\s+(?:distributed\s+)?(?:to\s+)?(.+)", "samples_distributed"),
+        ("follow", r"(?:change|set|update)?\s*(?:the\s+)?follow\s*up\s+(?:actions\s+)?(?:to\s+)?(.+)", "follow_up_actions"),
+    )
+]
+# One pass finds which anchor keywords occur, so only those fields' patterns are tried
+_FIELD_KEYWORD_RE = re.compile("|".join(keyword for keyword, _, _ in _FIELD_PATTERNS), re.IGNORECASE)
+
+_VALUE_PREFIX_RE = re.compile(r"^(as|to)\s+", re.IGNORECASE)
+
+# Task-command patterns run on casefolded input, so they need no IGNORECASE
+_PUT_RE = re.compile(r"put\s+(.+?)\s+as\s+(.+)")
+_EDIT_ID_RE = re.compile(r"edit\s+interaction\s+(\d+)")
+_EDIT_NAME_RES = [
+    re.compile(r"edit\s+interaction\s+with\s+(.+?)(?:\s+change\s+(.+))?$"),
+    re.compile(r"edit\s+interaction\s+for\s+(.+?)(?:\s+change\s+(.+))?$"),
+]
+_HISTORY_RES = [
+    re.compile(pattern)
+    for pattern in (
+        r"history\s+for\s+(.+)",
+        r"get\s+history\s+(.+)",
+        r"show\s+history\s+(.+)",
+        r"show\s+me\s+(?:the\s+)?history\s+for\s+(.+)",
+        r"show\s+me\s+(?:the\s+)?history\s+(?:of\s+)?(.+)",
+        r"get\s+me\s+(?:the\s+)?history\s+for\s+(.+)",
+        r"(.+)\s+history",
+    )
+]
+_HCP_RE = re.compile(r"(?:for|about)\s+(.+?)(?:\s+(?:last|past)\s+(\d+)\s+days?)?$")
+_PERIOD_RE = re.compile(r"(?:last|past)\s+(\d+)\s+days?")
+_INSIGHT_PREFIXES = ("insights", "analyze", "generate insights", "generate sales", "sales report", "pipeline report")
+_INSIGHT_CONTAINS = ("generate insights", "analyze pipeline", "sales analysis", "pipeline analysis")
+_COMMAND_SPLIT_RE = re.compile(r"\s*[;,]\s*|\s+(?:and\s+then|and|then)\s+", re.IGNORECASE)
+
+# Tools that may share a compound command ("-history for Dr X and insights for Dr Y").
+# Logging and form updates stay single-shot: their free text legitimately contains "and".
+_MULTI_COMMAND_TOOLS = {"get_interaction_history", "generate_sales_insights", "edit_interaction", "edit_interaction_by_name"}
+
+# General-conversation intents in priority order: when several phrases appear in a
+# message, the intent listed first wins. Greetings only count for short messages.
+_INTENT_PHRASES = {
+    "visit": ("doctor visit", "planned visit", "call planning", "visit planning"),
+    "content_suggestions": ("crm suggest", "content suggest", "recommend content", "suggest content"),
+    "content_management": ("content section", "digital content", "brochures", "pdfs", "content management"),
+    "hello": ("hello", "hi", "hey"),
+    "good_morning": ("good morning",),
+    "good_afternoon": ("good afternoon",),
+    "good_evening": ("good evening",),
+    "how_are_you": ("how are you", "how you doing", "what's up", "how's it going"),
+    "help": ("help", "what can you do", "how do i", "commands"),
+    "thanks": ("thank you", "thanks", "appreciate"),
+    "about_me": ("who are you", "what are you", "tell me about yourself"),
+    "hcp_definition": ("what is hcp", "what are hcp", "what does hcp mean", "define hcp"),
+    "hcp_who": ("who are hcp", "who is hcp", "who are healthcare professionals"),
+    "crm": ("crm", "customer relationship management"),
+    "interactions": ("interaction", "sales interaction", "medical sales"),
+    "weather": ("weather", "today", "weekend"),
+    "joke": ("joke", "funny", "laugh"),
+    "compliment": ("good job", "great", "awesome", "nice"),
+    "work": ("how was work", "how's work", "busy day", "long day"),
+    "pharma": ("pharmaceutical", "pharma", "medicine", "drug", "medical device"),
+    "system": ("how does this work", "how do you work", "explain this system"),
+}
+_GREETING_INTENTS = {"hello", "good_morning", "good_afternoon", "good_evening"}
+_INTENT_RANK = {intent: rank for rank, intent in enumerate(_INTENT_PHRASES)}
+
+def _compile_intents(intents) -> re.Pattern:
+    # Each alternative sits in a lookahead so finditer reports a hit at every position
+    alternatives = "|".join(
+        f"(?P<{intent}>{'|'.join(map(re.escape, _INTENT_PHRASES[intent]))})" for intent in intents
+    )
+    return re.compile(f"(?=(?:{alternatives}))")
+
+_INTENT_RE = _compile_intents(_INTENT_PHRASES)
+_INTENT_NO_GREETING_RE = _compile_intents(intent for intent in _INTENT_PHRASES if intent not in _GREETING_INTENTS)
+
+# Greetings open the message, so a short one is recognised from its first word(s) alone;
+# it only stands if none of the intents that outrank it appear anywhere in the text
+_GREETINGS: Final[Dict[str, str]] = {
+    "hello": "hello",
+    "hi": "hello",
+    "hey": "hello",
+    "good morning": "good_morning",
+    "good afternoon": "good_afternoon",
+    "good evening": "good_evening",
+}
+_OUTRANKING_RES = {
+    greeting: _compile_intents(intent for intent in _INTENT_PHRASES if _INTENT_RANK[intent] < _INTENT_RANK[greeting])
+    for greeting in _GREETING_INTENTS
+}
+
+# Canned replies, interned once at import so dispatch just hands back a reference
+_RESP_VISIT: Final[str] = "Excellent question about visit planning! In HCP CRM systems, planned doctor visits are optimized through:\n\n• Call Planning: Schedule visits based on HCP preferences and availability\n• Pre-visit Preparation: System generates briefing with HCP history, recent interactions, and relevant talking points\n• Content Recommendations: AI suggests materials based on HCP specialty, interests, and previous engagement\n• Territory Management: Optimizes routing and scheduling for maximum efficiency\n• Compliance Checks: Ensures all planned activities meet regulatory requirements\n\nThe system uses AI to analyze HCP profiles, interaction history, and current campaigns to recommend the most relevant approach for each visit. What specific aspect of visit planning interests you most?"
+_RESP_CONTENT_SUGGESTIONS: Final[str] = "Great question about content recommendations! The CRM uses AI to suggest relevant content through:\n\n• HCP Profiling: Analyzes specialty, interests, and previous content engagement\n• Interaction History: Reviews past discussions and materials that resonated\n• Campaign Alignment: Matches current marketing campaigns with HCP interests\n• Therapeutic Area Mapping: Suggests content based on HCP's medical specialties\n• Engagement Analytics: Recommends content with highest engagement rates\n• Compliance Filtering: Ensures all suggested content is approved for the specific HCP\n\nFor example, if visiting a cardiologist who previously engaged with heart failure content, the system would suggest the latest cardiac research, product updates, and relevant case studies. Would you like more details about any specific aspect?"
+_RESP_CONTENT_MANAGEMENT: Final[str] = "Great question about content management! In a typical HCP CRM, the content section manages digital materials like brochures, PDFs, and educational content. Here's how it works:\n\n• Content Library: Stores approved materials by therapeutic area\n• HCP Profiling: Tracks content preferences and engagement\n• Smart Recommendations: Suggests relevant content based on HCP specialty and previous interactions\n• Usage Analytics: Monitors which materials are most effective\n• Compliance: Ensures all content is medically and legally approved\n\nFor planned visits, the system would analyze the HCP's specialty, previous interactions, and current campaigns to suggest the most relevant materials. Would you like to know more about any specific aspect?"
+_RESP_HELLO: Final[str] = "Hi! How are you doing today? 😊"
+_RESP_GOOD_MORNING: Final[str] = "Good morning! Hope you're having a great day! ☀️"
+_RESP_GOOD_AFTERNOON: Final[str] = "Good afternoon! How's your day going? 🌤️"
+_RESP_GOOD_EVENING: Final[str] = "Good evening! Hope you had a productive day! 🌙"
+_RESP_HOW_ARE_YOU: Final[str] = "I'm doing great, thanks for asking! I'm here and ready to help with your HCP interactions. How about you? How's your day going?"
+_RESP_HELP: Final[str] = """I can help you with several HCP interaction tasks! Here's what I can do:
 
 • Log new interactions: Use "-" before describing your meeting (e.g., "-I met with Dr. Smith today...")
 • Edit interactions: Use "-edit interaction [ID]" or "-edit interaction with [name]"
@@ -114,67 +155,152 @@ def _handle_general_conversation(user_input: str) -> str:
 The "-" prefix tells me you want to perform a task. Without it, we're just having a regular conversation! 😊
 
 What would you like to do?"""
+_RESP_THANKS: Final[str] = "You're so welcome! Always happy to help! 😊 Is there anything else you'd like to chat about or any tasks you need help with?"
+_RESP_ABOUT_ME: Final[str] = "I'm your friendly HCP interaction assistant! I help manage healthcare professional interactions in your CRM system. I can be both a chatbot for casual conversation and a powerful tool for managing your sales interactions. Just use '-' before any task you want me to perform!"
+_RESP_HCP_DEFINITION: Final[str] = "HCP stands for Healthcare Professional! These are medical professionals like doctors, nurses, specialists, and other healthcare providers. In the context of pharmaceutical and medical device sales, HCPs are the key people that sales representatives interact with to discuss products, share medical information, and build professional relationships. They're essentially the healthcare experts who make treatment decisions for patients."
+_RESP_HCP_WHO: Final[str] = "Healthcare Professionals (HCPs) are the medical experts you work with! This includes:\n\n• Doctors - Primary care physicians, specialists, surgeons\n• Nurses - Registered nurses, nurse practitioners, clinical staff\n• Hospital Staff - Department heads, administrators, pharmacists\n• Researchers - Clinical researchers, medical researchers\n• Specialists - Cardiologists, oncologists, neurologists, etc.\n\nBasically, anyone in the healthcare field who might be interested in your medical products or services!"
+_RESP_CRM: Final[str] = "A CRM (Customer Relationship Management) system helps manage all your interactions with healthcare professionals! It's like a digital assistant that keeps track of your meetings, calls, emails, and follow-ups with doctors and other medical professionals. Think of it as your organized notebook that remembers everything about your professional relationships."
+_RESP_INTERACTIONS: Final[str] = "Sales interactions are all the ways you connect with healthcare professionals! This could be:\n\n• Face-to-face meetings - Office visits, hospital meetings\n• Phone calls - Check-ins, product discussions\n• Emails - Follow-ups, information sharing\n• Conferences - Medical conferences, trade shows\n• Educational events - Training sessions, product demos\n\nEach interaction is valuable for building relationships and sharing important medical information!"
+_RESP_WEATHER: Final[str] = "I wish I could check the weather for you, but I'm focused on helping with HCP interactions! How's your day going though? Any interesting meetings or calls with healthcare professionals?"
+_RESP_JOKE: Final[str] = "Haha, I'm better at managing HCP interactions than telling jokes! But here's one: Why did the sales rep bring a ladder to the meeting? Because they wanted to reach new heights with their HCP relationships! 😄"
+_RESP_COMPLIMENT: Final[str] = "Aww, thank you! That really makes my day! 😊 I love helping with HCP interactions. Is there anything else you'd like to chat about?"
+_RESP_WORK: Final[str] = "I hope your work day is going well! Are you managing lots of HCP interactions today? I'm here if you need help logging any meetings or calls with healthcare professionals."
+_RESP_PHARMA: Final[str] = "Pharmaceutical and medical device sales are fascinating fields! You're helping bring important treatments to healthcare professionals who can improve patient lives. That's really meaningful work. Are you working with any specific therapeutic areas?"
+_RESP_SYSTEM: Final[str] = "I'm designed to make your HCP interaction management super easy! I can work in two ways:\n\n• Chat mode (like right now) - Just talk to me normally\n• Task mode - Use '-' before commands to log interactions, edit data, get history, etc.\n\nI'm powered by AI to understand natural language and help you stay organized with your healthcare professional relationships!"
+_RESP_WHAT_QUESTION: Final[str] = "Great question! I can help you manage your relationships with healthcare professionals. I can log your meetings and calls, help you edit interaction details, retrieve history for specific HCPs, and generate insights about your sales activities. What specific task interests you?"
+_RESP_HOW_QUESTION: Final[str] = "It's really simple! For casual conversation, just talk to me normally (like you're doing now). When you want me to do something specific, just add a '-' at the beginning. For example:\n\n• Normal: \"How are you?\"\n• Task: \"-Show me history for Dr. Smith\"\n\nTry it out - what would you like to do?"
+_RESP_FALLBACK: Final[str] = "That's interesting! I'm here to chat or help with HCP interaction tasks. Feel free to tell me more about what's on your mind, or if you need help with any sales interactions, just add a '-' before your request!"
+
+# Replies keyed by (locale, intent); a locale without its own text falls back to English
+_DEFAULT_LOCALE: Final = "en"
+_RESPONSES: Final[Dict[Tuple[str, str], str]] = {
+    ("en", "visit"): _RESP_VISIT,
+    ("en", "content_suggestions"): _RESP_CONTENT_SUGGESTIONS,
+    ("en", "content_management"): _RESP_CONTENT_MANAGEMENT,
+    ("en", "hello"): _RESP_HELLO,
+    ("en", "good_morning"): _RESP_GOOD_MORNING,
+    ("en", "good_afternoon"): _RESP_GOOD_AFTERNOON,
+    ("en", "good_evening"): _RESP_GOOD_EVENING,
+    ("en", "how_are_you"): _RESP_HOW_ARE_YOU,
+    ("en", "help"): _RESP_HELP,
+    ("en", "thanks"): _RESP_THANKS,
+    ("en", "about_me"): _RESP_ABOUT_ME,
+    ("en", "hcp_definition"): _RESP_HCP_DEFINITION,
+    ("en", "hcp_who"): _RESP_HCP_WHO,
+    ("en", "crm"): _RESP_CRM,
+    ("en", "interactions"): _RESP_INTERACTIONS,
+    ("en", "weather"): _RESP_WEATHER,
+    ("en", "joke"): _RESP_JOKE,
+    ("en", "compliment"): _RESP_COMPLIMENT,
+    ("en", "work"): _RESP_WORK,
+    ("en", "pharma"): _RESP_PHARMA,
+    ("en", "system"): _RESP_SYSTEM,
+    ("en", "what_question"): _RESP_WHAT_QUESTION,
+    ("en", "how_question"): _RESP_HOW_QUESTION,
+    ("en", "fallback"): _RESP_FALLBACK,
+}
+
+# Lead-ins for tool results
+_PFX_LOG_OK: Final[str] = "Great! I've successfully logged your interaction. "
+_PFX_LOG_ERR: Final[str] = "I encountered an issue while logging your interaction. "
+_PFX_EDIT_OK: Final[str] = "Perfect! I've updated the interaction as requested. "
+_PFX_EDIT_MULTIPLE: Final[str] = "I found several interactions for that person. Here are your options:\n\n"
+_PFX_EDIT_NOT_FOUND: Final[str] = "I couldn't find any interactions matching your request. "
+_PFX_EDIT_ERR: Final[str] = "I had trouble updating the interaction. "
+_PFX_FORM_OK: Final[str] = "Done! I've updated the form field for you. "
+_PFX_FORM_ERR: Final[str] = "I couldn't update that field. "
+_PFX_HISTORY_NOT_FOUND: Final[str] = "I couldn't find any interaction history for that person. "
+_PFX_HISTORY_ERR: Final[str] = "I had trouble retrieving the interaction history. "
+_PFX_HISTORY_OK: Final[str] = "Here's the interaction history you requested:\n\n"
+_PFX_INSIGHTS_ERR: Final[str] = "I couldn't generate the sales insights right now. "
+_PFX_INSIGHTS_OK: Final[str] = "Here are the sales insights based on your request:\n\n"
+_PFX_UNKNOWN: Final[str] = "I'm not sure how to help with that. "
+
+_STATUS_CHARS: Final = ("✅", "❌")
+_strip_status = re.compile(r"[✅❌]").sub
+
+# Lead-in per (tool, status), where status is the result's leading ✅/❌ or None
+_STATUS_PREFIXES: Final = {
+    ("log_interaction", "✅"): _PFX_LOG_OK,
+    ("log_interaction", "❌"): _PFX_LOG_ERR,
+    ("edit_interaction", "✅"): _PFX_EDIT_OK,
+    ("edit_interaction", "❌"): _PFX_EDIT_ERR,
+    ("edit_interaction_by_name", "✅"): _PFX_EDIT_OK,
+    ("edit_interaction_by_name", "❌"): _PFX_EDIT_ERR,
+    ("update_form_field", "✅"): _PFX_FORM_OK,
+    ("update_form_field", "❌"): _PFX_FORM_ERR,
+    ("get_interaction_history", "✅"): _PFX_HISTORY_OK,
+    ("get_interaction_history", "❌"): _PFX_HISTORY_ERR,
+    ("get_interaction_history", None): _PFX_HISTORY_OK,
+    ("generate_sales_insights", "✅"): _PFX_INSIGHTS_OK,
+    ("generate_sales_insights", "❌"): _PFX_INSIGHTS_ERR,
+    ("generate_sales_insights", None): _PFX_INSIGHTS_OK,
+    ("error", "✅"): _PFX_UNKNOWN,
+    ("error", "❌"): _PFX_UNKNOWN,
+    ("error", None): _PFX_UNKNOWN,
+}
+# Lead-ins for the plain-text "not found" / "pick one" results, keyed by tool
+_NO_MATCH_PREFIXES: Final = {
+    "edit_interaction": _PFX_EDIT_NOT_FOUND,
+    "edit_interaction_by_name": _PFX_EDIT_NOT_FOUND,
+    "get_interaction_history": _PFX_HISTORY_NOT_FOUND,
+}
+_EDIT_TOOLS: Final = frozenset({"edit_interaction", "edit_interaction_by_name"})
+
+def _make_response_conversational(tool_result: str, user_input: str, tool_name: str) -> str:
+    """
+    Convert technical tool responses into more natural, conversational responses.
     
-    # Thank you patterns
-    elif any(thanks in user_lower for thanks in ["thank you", "thanks", "appreciate"]):
-        return "You're so welcome! Always happy to help! 😊 Is there anything else you'd like to chat about or any tasks you need help with?"
-    
-    # Personal questions
-    elif any(question in user_lower for question in ["who are you", "what are you", "tell me about yourself"]):
-        return "I'm your friendly HCP interaction assistant! I help manage healthcare professional interactions in your CRM system. I can be both a chatbot for casual conversation and a powerful tool for managing your sales interactions. Just use '-' before any task you want me to perform!"
-    
-    # Specific HCP-related questions
-    elif any(question in user_lower for question in ["what is hcp", "what are hcp", "what does hcp mean", "define hcp"]):
-        return "HCP stands for Healthcare Professional! These are medical professionals like doctors, nurses, specialists, and other healthcare providers. In the context of pharmaceutical and medical device sales, HCPs are the key people that sales representatives interact with to discuss products, share medical information, and build professional relationships. They're essentially the healthcare experts who make treatment decisions for patients."
-    
-    elif any(question in user_lower for question in ["who are hcp", "who is hcp", "who are healthcare professionals"]):
-        return "Healthcare Professionals (HCPs) are the medical experts you work with! This includes:\n\n• Doctors - Primary care physicians, specialists, surgeons\n• Nurses - Registered nurses, nurse practitioners, clinical staff\n• Hospital Staff - Department heads, administrators, pharmacists\n• Researchers - Clinical researchers, medical researchers\n• Specialists - Cardiologists, oncologists, neurologists, etc.\n\nBasically, anyone in the healthcare field who might be interested in your medical products or services!"
-    
-    elif any(term in user_lower for term in ["crm", "customer relationship management"]):
-        return "A CRM (Customer Relationship Management) system helps manage all your interactions with healthcare professionals! It's like a digital assistant that keeps track of your meetings, calls, emails, and follow-ups with doctors and other medical professionals. Think of it as your organized notebook that remembers everything about your professional relationships."
-    
-    elif any(term in user_lower for term in ["interaction", "sales interaction", "medical sales"]):
-        return "Sales interactions are all the ways you connect with healthcare professionals! This could be:\n\n• Face-to-face meetings - Office visits, hospital meetings\n• Phone calls - Check-ins, product discussions\n• Emails - Follow-ups, information sharing\n• Conferences - Medical conferences, trade shows\n• Educational events - Training sessions, product demos\n\nEach interaction is valuable for building relationships and sharing important medical information!"
-    
-    # Weather/casual conversation
-    elif any(word in user_lower for word in ["weather", "today", "weekend"]):
-        return "I wish I could check the weather for you, but I'm focused on helping with HCP interactions! How's your day going though? Any interesting meetings or calls with healthcare professionals?"
-    
-    # Jokes/fun
-    elif any(word in user_lower for word in ["joke", "funny", "laugh"]):
-        return "Haha, I'm better at managing HCP interactions than telling jokes! But here's one: Why did the sales rep bring a ladder to the meeting? Because they wanted to reach new heights with their HCP relationships! 😄"
-    
-    # Compliments
-    elif any(word in user_lower for word in ["good job", "great", "awesome", "nice"]):
-        return "Aww, thank you! That really makes my day! 😊 I love helping with HCP interactions. Is there anything else you'd like to chat about?"
-    
-    # Work-related questions
-    elif any(phrase in user_lower for phrase in ["how was work", "how's work", "busy day", "long day"]):
-        return "I hope your work day is going well! Are you managing lots of HCP interactions today? I'm here if you need help logging any meetings or calls with healthcare professionals."
-    
-    # Product/pharma related questions
-    elif any(word in user_lower for word in ["pharmaceutical", "pharma", "medicine", "drug", "medical device"]):
-        return "Pharmaceutical and medical device sales are fascinating fields! You're helping bring important treatments to healthcare professionals who can improve patient lives. That's really meaningful work. Are you working with any specific therapeutic areas?"
-    
-    # Specific CRM functionality questions
-    elif any(phrase in user_lower for phrase in ["content section", "digital content", "brochures", "pdfs", "content management"]):
-        return "Great question about content management! In a typical HCP CRM, the content section manages digital materials like brochures, PDFs, and educational content. Here's how it works:\n\n• Content Library: Stores approved materials by therapeutic area\n• HCP Profiling: Tracks content preferences and engagement\n• Smart Recommendations: Suggests relevant content based on HCP specialty and previous interactions\n• Usage Analytics: Monitors which materials are most effective\n• Compliance: Ensures all content is medically and legally approved\n\nFor planned visits, the system would analyze the HCP's specialty, previous interactions, and current campaigns to suggest the most relevant materials. Would you like to know more about any specific aspect?"
-    
-    # Questions about the system
-    elif any(phrase in user_lower for phrase in ["how does this work", "how do you work", "explain this system"]):
-        return "I'm designed to make your HCP interaction management super easy! I can work in two ways:\n\n• Chat mode (like right now) - Just talk to me normally\n• Task mode - Use '-' before commands to log interactions, edit data, get history, etc.\n\nI'm powered by AI to understand natural language and help you stay organized with your healthcare professional relationships!"
-    
+    JSON payloads (log_interaction, update_form_field) go out unwrapped: a lead-in
+    would make them invalid JSON, and their status marker sits inside "message".
+    """
+    if tool_result[:1] == "{":
+        return tool_result
+    status = tool_result[:1] if tool_result[:1] in _STATUS_CHARS else None
+    if status is None:
+        if tool_name in _EDIT_TOOLS and "Multiple interactions found" in tool_result:
+            return _PFX_EDIT_MULTIPLE + tool_result
+        if tool_name in _NO_MATCH_PREFIXES and "No interactions found" in tool_result:
+            return _NO_MATCH_PREFIXES[tool_name] + tool_result
+    
+    prefix = _STATUS_PREFIXES.get((tool_name, status))
+    if prefix is None:
+        # Default: return the original response for any unhandled cases
+        return tool_result
+    return prefix + (_strip_status("", tool_result).strip() if status else tool_result)
+
+def _handle_general_conversation(user_input: str, locale: str = _DEFAULT_LOCALE) -> str:
+    """
+    Handle general conversation like a friendly chatbot.
+    """
+    # Tokenize once: the joined tokens are the normalized cache key, their count gates greetings
+    tokens = user_input.lower().split()
+    intent = _conversation_intent(" ".join(tokens), len(tokens))
+    return _RESPONSES.get((locale, intent)) or _RESPONSES[(_DEFAULT_LOCALE, intent)]
+
+@lru_cache(maxsize=2048)
+def _conversation_intent(user_lower: str, word_count: int) -> str:
+    """Intent of an already-normalized message; the mapping is static so it caches forever"""
+    if word_count <= 3:
+        head = user_lower.split(" ", 2)
+        greeting = _GREETINGS.get(head[0]) or _GREETINGS.get(" ".join(head[:2]))
+        if greeting and not _OUTRANKING_RES[greeting].search(user_lower):
+            return greeting
+    
+    # One scan finds every phrase hit; the highest-priority intent wins
+    intent_re = _INTENT_RE if word_count <= 3 else _INTENT_NO_GREETING_RE
+    intent = min((match.lastgroup for match in intent_re.finditer(user_lower)), key=_INTENT_RANK.__getitem__, default=None)
+    if intent:
+        return intent
     
     # Specific question patterns
-    elif user_lower.startswith("what") and ("do" in user_lower or "can" in user_lower):
-        return "Great question! I can help you manage your relationships with healthcare professionals. I can log your meetings and calls, help you edit interaction details, retrieve history for specific HCPs, and generate insights about your sales activities. What specific task interests you?"
-    
-    elif user_lower.startswith("how") and ("use" in user_lower or "work" in user_lower):
-        return "It's really simple! For casual conversation, just talk to me normally (like you're doing now). When you want me to do something specific, just add a '-' at the beginning. For example:\n\n• Normal: \"How are you?\"\n• Task: \"-Show me history for Dr. Smith\"\n\nTry it out - what would you like to do?"
+    if user_lower.startswith("what") and ("do" in user_lower or "can" in user_lower):
+        return "what_question"
+    if user_lower.startswith("how") and ("use" in user_lower or "work" in user_lower):
+        return "how_question"
     
     # Fallback for general conversation
-    else:
-        return "That's interesting! I'm here to chat or help with HCP interaction tasks. Feel free to tell me more about what's on your mind, or if you need help with any sales interactions, just add a '-' before your request!"
+    return "fallback"
 
 def _parse_field_updates(updates_text: str) -> dict:
     """
@@ -190,170 +316,160 @@ def _parse_field_updates(updates_text: str) -> dict:
         return {}
     
     params = {}
-    text_lower = updates_text.lower().strip()
-    
-    # Field mapping
-    field_patterns = {
-        r"(?:change|set|update)?\s*(?:the\s+)?time\s+(?:to\s+)?(.+)": "interaction_time",
-        r"(?:change|set|update)?\s*(?:the\s+)?date\s+(?:to\s+)?(.+)": "interaction_date", 
-        r"(?:change|set|update)?\s*(?:the\s+)?sentiment\s+(?:to\s+)?(.+)": "sentiment",
-        r"(?:change|set|update)?\s*(?:the\s+)?(?:interaction\s+)?type\s+(?:to\s+)?(.+)": "interaction_type",
-        r"(?:change|set|update)?\s*(?:the\s+)?attendees\s+(?:to\s+)?(.+)": "attendees",
-        r"(?:change|set|update)?\s*(?:the\s+)?summary\s+(?:to\s+)?(.+)": "summary",
-        r"(?:change|set|update)?\s*(?:the\s+)?(?:key\s+)?discussion\s+(?:points\s+)?(?:to\s+)?(.+)": "key_discussion_points",
-        r"(?:change|set|update)?\s*(?:the\s+)?materials\s+(?:shared\s+)?(?:to\s+)?(.+)": "materials_shared",
-        r"(?:change|set|update)?\s*(?:the\s+)?samples\s+(?:distributed\s+)?(?:to\s+)?(.+)": "samples_distributed",
-        r"(?:change|set|update)?\s*(?:the\s+)?follow\s*up\s+(?:actions\s+)?(?:to\s+)?(.+)": "follow_up_actions"
-    }
-    
-    for pattern, field_name in field_patterns.items():
-        match = re.search(pattern, text_lower)
+    keywords = {keyword.lower() for keyword in _FIELD_KEYWORD_RE.findall(updates_text)}
+    if not keywords:
+        return params
+    
+    for keyword, pattern, field_name in _FIELD_PATTERNS:
+        if keyword not in keywords:
+            continue
+        match = pattern.search(updates_text)
         if match:
             value = match.group(1).strip()
             # Clean up common prefixes/suffixes
-            value = re.sub(r'^(as|to)\s+', '', value)
+            value = _VALUE_PREFIX_RE.sub('', value)
             value = value.strip('"\'')
             params[field_name] = value
             break
     
     return params
 
-def determine_intent_and_route(user_input: str) -> dict:
+def determine_intent_and_route(user_input: str) -> RouteInfo:
     """
     Command prefix system: '-' indicates task command, otherwise conversational response.
     Returns the appropriate tool and parsed parameters.
     """
-    user_input = user_input.strip()
+    # Conversation is the common case: decide on the first character before copying anything
+    if user_input[:1] != "-":
+        if not user_input[:1].isspace():
+            return _GENERAL_ROUTE
+        user_input = user_input.lstrip()
+        if user_input[:1] != "-":
+            return _GENERAL_ROUTE
+    
+    # Remove the - prefix and process as a task command
+    return _route_task_command(user_input[1:].strip())
+
+def _split_commands(task_input: str) -> list:
+    """Split a compound task command on and/then/;/, into its fragments"""
+    fragments = [fragment.lstrip("-").strip() for fragment in _COMMAND_SPLIT_RE.split(task_input)]
+    return [fragment for fragment in fragments if fragment]
+
+def determine_intents_and_route(user_input: str) -> List[RouteInfo]:
+    """
+    Like determine_intent_and_route, but a compound task command yields one route per
+    fragment. The split is only kept when every fragment is a recognised multi-command
+    tool; otherwise the whole input is routed as a single command.
+    """
+    stripped = user_input.strip()
+    if stripped.startswith("-"):
+        fragments = _split_commands(stripped[1:])
+        if len(fragments) > 1:
+            routes = [_route_task_command(fragment) for fragment in fragments]
+            if all(route.tool in _MULTI_COMMAND_TOOLS for route in routes):
+                return routes
+    return [determine_intent_and_route(user_input)]
+
+def _routes_independent(routes: List[RouteInfo]) -> bool:
+    """Edits aimed at the same interaction (or HCP) must run in order, not concurrently"""
+    targets = [
+        route.params.get("interaction_id") or route.params.get("hcp_name_search", "").lower()
+        for route in routes
+        if route.tool in _EDIT_TOOLS
+    ]
+    return len(targets) == len(set(targets))
+
+def _casefold_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    Casefold text and map every folded index back to its index in the original.
     
-    # Check if this is a task command (starts with -)
-    if user_input.startswith("-"):
-        # Remove the - prefix and process as a task command
-        task_input = user_input[1:].strip()
-        return _route_task_command(task_input)
-    else:
-        # Handle as general conversation
-        return {
-            "tool": "general_conversation",
-            "params": {"user_input": user_input}
-        }
+    Folding can change length (e.g. "ß" -> "ss"), so spans found in the folded text
+    are translated through the returned offsets before slicing the original.
+    """
+    if text.isascii():
+        return text.lower(), list(range(len(text) + 1))
+    folded: List[str] = []
+    offsets: List[int] = []
+    for index, char in enumerate(text):
+        char_folded = char.casefold()
+        folded.append(char_folded)
+        offsets.extend([index] * len(char_folded))
+    offsets.append(len(text))
+    return "".join(folded), offsets
 
-def _route_task_command(user_input: str) -> dict:
+
+def _route_task_command(user_input: str) -> RouteInfo:
     """
     Route task commands (without the - prefix) to appropriate tools.
     """
-    user_lower = user_input.lower().strip()
+    user_input = user_input.strip()
+    # Casefold once and match case-sensitive patterns; captures are sliced from the original
+    user_lower, offsets = _casefold_with_offsets(user_input)
+    
+    def original(start: int, end: int) -> str:
+        return user_input[offsets[start]:offsets[end]]
     
     # Tool 3: PUT Form Update - handle "put [field] as [value]" commands
     if user_lower.startswith("put "):
         # Extract field and value from "put [field] as [value]"
-        put_pattern = r"put\s+(.+?)\s+as\s+(.+)"
-        match = re.search(put_pattern, user_input, re.IGNORECASE)
+        match = _PUT_RE.search(user_lower)
         if match:
-            field_name = match.group(1).strip()
-            field_value = match.group(2).strip()
-            return {
-                "tool": "update_form_field",
-                "params": {"field_name": field_name, "field_value": field_value}
-            }
+            field_name = original(*match.span(1)).strip()
+            field_value = original(*match.span(2)).strip()
+            return RouteInfo("update_form_field", {"field_name": field_name, "field_value": field_value})
         else:
-            return {"tool": "error", "message": "Invalid PUT format. Use: 'put [field] as [value]'"}
+            return RouteInfo("error", message="Invalid PUT format. Use: 'put [field] as [value]'")
     
     # Tool 2: Edit Interaction - handle both ID and name-based editing
     elif "edit interaction" in user_lower:
         # First try to match by ID pattern: "edit interaction [id]"
-        edit_id_pattern = r"edit\s+interaction\s+(\d+)"
-        id_match = re.search(edit_id_pattern, user_input, re.IGNORECASE)
+        id_match = _EDIT_ID_RE.search(user_lower)
         
         if id_match:
             interaction_id = int(id_match.group(1))
-            remaining_text = user_input[id_match.end():].strip()
-            return {
-                "tool": "edit_interaction", 
-                "params": {"interaction_id": interaction_id, "updates": remaining_text}
-            }
+            remaining_text = original(id_match.end(), len(user_lower)).strip()
+            return RouteInfo("edit_interaction", {"interaction_id": interaction_id, "updates": remaining_text})
         else:
             # Try to match by name pattern: "edit interaction with [name]" 
             # Only match patterns that clearly indicate name-based editing
-            edit_name_patterns = [
-                r"edit\s+interaction\s+with\s+(.+?)(?:\s+change\s+(.+))?$",
-                r"edit\s+interaction\s+for\s+(.+?)(?:\s+change\s+(.+))?$"
-            ]
-            
-            for pattern in edit_name_patterns:
-                name_match = re.search(pattern, user_input, re.IGNORECASE)
+            for pattern in _EDIT_NAME_RES:
+                name_match = pattern.search(user_lower)
                 if name_match:
-                    hcp_name = name_match.group(1).strip()
-                    updates = name_match.group(2).strip() if name_match.group(2) else ""
-                    return {
-                        "tool": "edit_interaction_by_name",
-                        "params": {"hcp_name_search": hcp_name, "updates": updates}
-                    }
+                    hcp_name = original(*name_match.span(1)).strip()
+                    updates = original(*name_match.span(2)).strip() if name_match.group(2) else ""
+                    return RouteInfo("edit_interaction_by_name", {"hcp_name_search": hcp_name, "updates": updates})
             
-            return {"tool": "error", "message": "Invalid edit format. Use: 'edit interaction [id]' or 'edit interaction with [name]' or 'edit interaction for [name]'"}
+            return RouteInfo("error", message="Invalid edit format. Use: 'edit interaction [id]' or 'edit interaction with [name]' or 'edit interaction for [name]'")
     
     # Tool 4: Get Interaction History - handle "history for [hcp_name]" or "get history [hcp_name]"
     elif "history" in user_lower:
         # Extract HCP name from various history command formats
-        history_patterns = [
-            r"history\s+for\s+(.+)",
-            r"get\s+history\s+(.+)",
-            r"show\s+history\s+(.+)",
-            r"show\s+me\s+(?:the\s+)?history\s+for\s+(.+)",
-            r"show\s+me\s+(?:the\s+)?history\s+(?:of\s+)?(.+)",
-            r"get\s+me\s+(?:the\s+)?history\s+for\s+(.+)",
-            r"(.+)\s+history"
-        ]
-        
-        for pattern in history_patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in _HISTORY_RES:
+            match = pattern.search(user_lower)
             if match:
-                hcp_name = match.group(1).strip()
-                return {
-                    "tool": "get_interaction_history",
-                    "params": {"hcp_name": hcp_name}
-                }
+                hcp_name = original(*match.span(1)).strip()
+                return RouteInfo("get_interaction_history", {"hcp_name": hcp_name})
         
-        return {"tool": "error", "message": "Please specify HCP name for history. Use: 'history for [HCP name]'"}
+        return RouteInfo("error", message="Please specify HCP name for history. Use: 'history for [HCP name]'")
     
     # Tool 5: Generate Sales Insights - handle specific insight request commands
-    elif any(user_lower.startswith(keyword) for keyword in ["insights", "analyze", "generate insights", "generate sales", "sales report", "pipeline report"]) or \
-         any(keyword in user_lower for keyword in ["generate insights", "analyze pipeline", "sales analysis", "pipeline analysis"]):
+    elif user_lower.startswith(_INSIGHT_PREFIXES) or any(keyword in user_lower for keyword in _INSIGHT_CONTAINS):
         # Check if specific HCP is mentioned
-        hcp_pattern = r"(?:for|about)\s+(.+?)(?:\s+(?:last|past)\s+(\d+)\s+days?)?$"
-        match = re.search(hcp_pattern, user_input, re.IGNORECASE)
+        match = _HCP_RE.search(user_lower)
         
         if match:
-            hcp_name = match.group(1).strip()
+            hcp_name = original(*match.span(1)).strip()
             period_days = int(match.group(2)) if match.group(2) else 30
-            return {
-                "tool": "generate_sales_insights",
-                "params": {"hcp_name": hcp_name, "period_days": period_days}
-            }
+            return RouteInfo("generate_sales_insights", {"hcp_name": hcp_name, "period_days": period_days})
         else:
             # Check for period without specific HCP
-            period_match = re.search(r"(?:last|past)\s+(\d+)\s+days?", user_input, re.IGNORECASE)
+            period_match = _PERIOD_RE.search(user_lower)
             period_days = int(period_match.group(1)) if period_match else 30
-            return {
-                "tool": "generate_sales_insights", 
-                "params": {"hcp_name": "", "period_days": period_days}
-            }
+            return RouteInfo("generate_sales_insights", {"hcp_name": "", "period_days": period_days})
     
     # Tool 1: Log Interaction - default for everything else (natural language interaction logging)
     else:
-        return {
-            "tool": "log_interaction",
-            "params": {"raw_interaction_text": user_input}
-        }
-
-# Define the 6 core tools available to the agent
-tools = [
-    log_interaction,           # Tool 1: Log Interaction (with LLM summarization)
-    edit_interaction,          # Tool 2: Edit Interaction by ID
-    edit_interaction_by_name,  # Tool 2b: Edit Interaction by Name
-    update_form_field,         # Tool 3: PUT Form Update  
-    get_interaction_history,   # Tool 4: Get Interaction History
-    generate_sales_insights    # Tool 5: Generate Sales Insights
-]
+        return RouteInfo("log_interaction", {"raw_interaction_text": user_input})
 
 # Tool name to function mapping
 tool_map = {
@@ -365,84 +481,84 @@ tool_map = {
     "generate_sales_insights": generate_sales_insights
 }
 
-# Initialize LLM (we still need it for complex routing decisions if needed)
-try:
-    if not settings.groq_api_key:
-        raise ValueError("GROQ_API_KEY is not configured. Please set it in the .env file.")
-    
-    llm = ChatGroq(
-        temperature=0.1, 
-        model_name="gemma2-9b-it", 
-        groq_api_key=settings.groq_api_key
-    )
-    print(f"✅ Simplified LangGraph Agent initialized successfully")
-except Exception as e:
-    print(f"❌ Error initializing Simplified LangGraph Agent: {e}")
-    raise
+def _dispatch_edit_by_id(params: dict) -> str:
+    # Parse field updates from the natural-language tail of the command
+    return edit_interaction.invoke({"interaction_id": params["interaction_id"], **_parse_field_updates(params["updates"])})
+
+def _dispatch_edit_by_name(params: dict) -> str:
+    return edit_interaction_by_name.invoke({"hcp_name_search": params["hcp_name_search"], **_parse_field_updates(params["updates"])})
+
+# Routed tool name -> coroutine function taking the routing params; most tools take them as-is.
+# ainvoke awaits the LLM-bound async tools directly and runs the blocking DB ones in a worker thread
+_TOOL_DISPATCH: Dict[str, Callable[[dict], Awaitable[str]]] = {
+    **{name: tool.ainvoke for name, tool in tool_map.items()},
+    "edit_interaction": partial(asyncio.to_thread, _dispatch_edit_by_id),
+    "edit_interaction_by_name": partial(asyncio.to_thread, _dispatch_edit_by_name),
+}
+
+@lru_cache(maxsize=1)
+def _get_llm() -> ChatGroq:
+    """
+    LLM for complex routing decisions, built on first use. Keyword routing never needs
+    it, so importing the agent no longer constructs a Groq client.
+    """
+    try:
+        if not _GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY is not configured. Please set it in the .env file.")
+        
+        llm = ChatGroq(
+            temperature=0.1, 
+            model_name="gemma2-9b-it", 
+            groq_api_key=_GROQ_API_KEY
+        )
+        print("✅ Simplified LangGraph Agent initialized successfully")
+        return llm
+    except Exception as e:
+        print(f"❌ Error initializing Simplified LangGraph Agent: {e}")
+        raise
 
 # Define the graph state
 class AgentState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
     user_input: str
     tool_result: str
+    need_message: bool  # False when the caller only reads tool_result
+
+async def _execute_route(routing_info: RouteInfo, user_input: str) -> str:
+    """Run one routed command and phrase its result conversationally"""
+    if routing_info.tool == "error":
+        return _make_response_conversational(routing_info.message, user_input, "error")
+    elif routing_info.tool == "general_conversation":
+        return _handle_general_conversation(user_input)
+    try:
+        raw_result = await _TOOL_DISPATCH[routing_info.tool](routing_info.params)
+        return _make_response_conversational(raw_result, user_input, routing_info.tool)
+    except Exception as e:
+        error_msg = f"❌ Error executing {routing_info.tool}: {str(e)}"
+        return _make_response_conversational(error_msg, user_input, "error")
 
 # Define the nodes
-def route_and_execute(state: AgentState):
+async def route_and_execute(state: AgentState):
     """
     Main routing node that determines intent and executes the appropriate tool.
     This replaces the complex LLM-based routing with simple keyword detection.
     """
     user_input = state["messages"][-1].content if state["messages"] else ""
     
-    # Determine intent and get routing information
-    routing_info = determine_intent_and_route(user_input)
-    
-    if routing_info["tool"] == "error":
-        result = _make_response_conversational(routing_info['message'], user_input, "error")
-    elif routing_info["tool"] == "general_conversation":
-        result = _handle_general_conversation(user_input)
+    # Determine intent(s); independent parts of a compound command run concurrently
+    routes = determine_intents_and_route(user_input)
+    if len(routes) == 1:
+        result = await _execute_route(routes[0], user_input)
+    elif _routes_independent(routes):
+        result = "\n\n".join(await asyncio.gather(*(_execute_route(route, user_input) for route in routes)))
     else:
-        try:
-            # Get the tool function
-            tool_func = tool_map[routing_info["tool"]]
-            
-            # Execute the tool with parameters
-            if routing_info["tool"] == "update_form_field":
-                raw_result = tool_func.invoke(routing_info["params"])
-                result = _make_response_conversational(raw_result, user_input, "update_form_field")
-            elif routing_info["tool"] == "edit_interaction":
-                # Parse field updates from the command
-                interaction_id = routing_info["params"]["interaction_id"]
-                updates_text = routing_info["params"]["updates"]
-                params = {"interaction_id": interaction_id}
-                
-                # Parse field updates from natural language
-                params.update(_parse_field_updates(updates_text))
-                raw_result = tool_func.invoke(params)
-                result = _make_response_conversational(raw_result, user_input, "edit_interaction")
-            elif routing_info["tool"] == "edit_interaction_by_name":
-                # Parse field updates for name-based editing
-                hcp_name = routing_info["params"]["hcp_name_search"]
-                updates_text = routing_info["params"]["updates"]
-                params = {"hcp_name_search": hcp_name}
-                
-                # Parse field updates from natural language
-                params.update(_parse_field_updates(updates_text))
-                raw_result = tool_func.invoke(params)
-                result = _make_response_conversational(raw_result, user_input, "edit_interaction_by_name")
-            else:
-                raw_result = tool_func.invoke(routing_info["params"])
-                result = _make_response_conversational(raw_result, user_input, routing_info["tool"])
-                
-        except Exception as e:
-            error_msg = f"❌ Error executing {routing_info['tool']}: {str(e)}"
-            result = _make_response_conversational(error_msg, user_input, "error")
+        result = "\n\n".join([await _execute_route(route, user_input) for route in routes])
     
-    return {
-        "messages": state["messages"] + [FunctionMessage(content=result, name="agent_response")],
-        "user_input": user_input,
-        "tool_result": result
-    }
+    update = {"user_input": user_input, "tool_result": result}
+    if state.get("need_message", True):
+        # add_messages appends the new message, so return just that rather than a copy of the history
+        update["messages"] = [FunctionMessage(content=result, name="agent_response")]
+    return update
 
 # Create the simplified workflow
 workflow = StateGraph(AgentState)
@@ -457,7 +573,7 @@ workflow.add_edge("route_and_execute", END)
 # Compile the workflow
 app = workflow.compile()
 
-def process_user_input(user_input: str) -> str:
+async def aprocess_user_input(user_input: str) -> str:
     """
     Process user input through the conversational LangGraph agent with command prefix system.
     
@@ -476,17 +592,22 @@ def process_user_input(user_input: str) -> str:
     - Greetings, casual chat, questions, help requests
     - Friendly, ChatGPT-like responses with personality
     """
+    # Conversation never touches a tool, so answer it without running the graph
+    stripped = user_input.strip()
+    if not stripped.startswith("-"):
+        return _handle_general_conversation(stripped)
+    
     try:
         # Create initial state
-        from langchain_core.messages import HumanMessage
         initial_state = {
             "messages": [HumanMessage(content=user_input)],
             "user_input": user_input,
-            "tool_result": ""
+            "tool_result": "",
+            "need_message": False,
         }
         
         # Process through the workflow
-        result = app.invoke(initial_state)
+        result = await app.ainvoke(initial_state)
         
         # Return the tool result
         return result.get("tool_result", "No result generated")
@@ -494,6 +615,17 @@ def process_user_input(user_input: str) -> str:
     except Exception as e:
         return f"❌ Error processing request: {str(e)}"
 
+def process_user_input(user_input: str) -> str:
+    """Synchronous wrapper around aprocess_user_input for callers outside an event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(aprocess_user_input(user_input))
+    raise RuntimeError(
+        "process_user_input() cannot be called from a running event loop; "
+        "use 'await aprocess_user_input(...)' instead"
+    )
+
 # Agent description for documentation
 AGENT_DESCRIPTION = """
 # LangGraph AI Agent for HCP Interaction Management
@@ -1,13 +1,28 @@
-from langchain_core.messages import BaseMessage, FunctionMessage, HumanMessage
+from langchain_core.caches import InMemoryCache
+from langchain_core.messages import BaseMessage, FunctionMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_groq import ChatGroq
 from langgraph.graph import END, StateGraph
-from typing import Literal, TypedDict, Dict, Any, List, Tuple
+from typing import Literal, TypedDict, Dict, Any, AsyncIterator, Final, List, Optional, Tuple, Union
 from typing_extensions import Annotated
 from langgraph.graph.message import add_messages
-import json
+import asyncio
+import copy
+import hashlib
+import httpx
+import logging
+import orjson
 import re
-from datetime import datetime, timedelta
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from cachetools import TTLCache
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional: without it every query is routed by the LLM
+    SentenceTransformer = None
 
 # Import tools
 from .tools import (
@@ -19,7 +34,9 @@ from .tools import (
     generate_sales_insights,
     form_information_tool
 )
-from ..core.config import settings
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
 
 class IntelligentAgentState(TypedDict):
     """State for the intelligent AI agent with LLM-based decision making"""
@@ -28,14 +45,183 @@ class IntelligentAgentState(TypedDict):
     query_analysis: Dict[str, Any]
     selected_tool: str
     tool_parameters: Dict[str, Any]
-    tool_result: str
+    tool_result: Union[str, Dict[str, Any]]
     form_data: Dict[str, Any]
 
+# Tool catalogue shown to the analyzer: one short line per tool, as compact JSON
+_TOOL_CATALOG = (
+    ("log_interaction", "user describes a NEW interaction they had with an HCP"),
+    ("edit_interaction", "user wants to MODIFY/UPDATE an existing interaction"),
+    ("get_interaction_history", "user wants to SEE PAST interactions with an HCP"),
+    ("generate_sales_insights", "user wants ANALYSIS/INSIGHTS/REPORTS"),
+    ("form_information_tool", "user wants to CHECK/REVIEW the current form data"),
+    ("general_conversation", "GENERAL QUESTIONS, EXPLANATIONS or CASUAL CONVERSATION, not a database task"),
+)
+
+# Static analyzer instructions, built once. The query goes in its own message, so every
+# request sends a byte-identical system prompt (a shared prefix for provider-side caching)
+_ANALYSIS_INSTRUCTIONS: Final[str] = """You are an AI assistant that helps healthcare sales representatives manage their interactions with Healthcare Professionals (HCPs).
+
+Pick the tool that best handles the user query. Tools: """ + orjson.dumps(
+    [{"name": name, "use": use} for name, use in _TOOL_CATALOG]
+).decode() + """
+
+Return JSON matching this schema, leaving out entities that are not mentioned:
+{
+    "user_intent": "what the user wants to do",
+    "reasoning": "brief reasoning for the tool choice",
+    "selected_tool": \"""" + "|".join(name for name, _ in _TOOL_CATALOG) + """\",
+    "confidence": "high|medium|low",
+    "extracted_entities": {
+        "hcp_name": "e.g. 'Dr. Smith', 'Neha Singh'",
+        "interaction_type": "meeting|call|email|visit|conference",
+        "sentiment": "positive|negative|neutral",
+        "date": "e.g. 'today', '2024-01-15'",
+        "time": "e.g. '14:50', '2:30 PM'",
+        "materials": "materials",
+        "samples": "samples",
+        "topics": "topics discussed",
+        "specific_requests": "requested modifications"
+    },
+    "general_answer": "only for general_conversation: a concise, friendly, professional answer; otherwise empty"
+}
+"""
+_ANALYSIS_SYSTEM_MESSAGE = SystemMessage(content=_ANALYSIS_INSTRUCTIONS)
+
+# Entities-only prompt for queries whose tool is already known, a fraction of the full analysis
+_ENTITY_INSTRUCTIONS: Final[str] = """You extract details from messages that healthcare sales representatives write about their interactions with Healthcare Professionals (HCPs).
+
+Return a JSON object with the details mentioned in the user query, leaving out any that are not mentioned:
+{
+    "hcp_name": "HCP name (e.g., 'Dr. Smith', 'Neha Singh')",
+    "interaction_type": "meeting|call|email|visit|conference",
+    "sentiment": "positive|negative|neutral",
+    "date": "date (e.g., 'today', '2024-01-15')",
+    "time": "time (e.g., '14:50', '2:30 PM', '10:00')",
+    "materials": "materials",
+    "samples": "samples",
+    "topics": "topics discussed",
+    "specific_requests": "any specific modifications or requests"
+}
+
+Return only valid JSON, no explanations.
+"""
+_ENTITY_SYSTEM_MESSAGE = SystemMessage(content=_ENTITY_INSTRUCTIONS)
+
+def _normalize_query(user_query: str) -> str:
+    """Cache key for a query: runs of whitespace and trailing punctuation don't change its meaning"""
+    return " ".join(user_query.split()).rstrip(" .!?")
+
+# Small talk that never needs the LLM to classify or answer (keys are normalized, lowercased)
+_GREETING_REPLY = "Hi! How can I help with your HCP interactions today?"
+_THANKS_REPLY = "You're welcome! Let me know if there's anything else I can help with."
+_CANNED_REPLIES = {
+    "": "I'm here to help with your HCP interactions - describe a meeting, ask for history or insights, or ask me a question.",
+    "hi": _GREETING_REPLY,
+    "hello": _GREETING_REPLY,
+    "hey": _GREETING_REPLY,
+    "thanks": _THANKS_REPLY,
+    "thank you": _THANKS_REPLY,
+    "ok": "Great! What would you like to do next?",
+    "okay": "Great! What would you like to do next?",
+    "bye": "Goodbye! Have a great day.",
+}
+
+# Embedding router: a query whose nearest tool example is close enough (and clearly closer
+# than any other tool's) skips the analysis LLM call
+_ROUTER_MODEL = "all-MiniLM-L6-v2"
+_ROUTER_MIN_SIMILARITY = 0.78
+_ROUTER_MIN_MARGIN = 0.05
+# Tools that run on the raw query alone; the rest need the LLM's entity extraction
+_ENTITY_FREE_TOOLS = frozenset({"log_interaction", "form_information_tool", "general_conversation"})
+
+# Keyword fallback used when the LLM analysis fails, in priority order:
+# tool -> (phrases, user_intent, reasoning)
+_FALLBACK_RULES = {
+    "log_interaction": (
+        ("met with", "had a call", "visited", "spoke with", "discussed with"),
+        "User is describing a new interaction",
+        "Pattern matching detected new interaction keywords",
+    ),
+    "edit_interaction": (
+        ("update", "edit", "change", "modify", "correct"),
+        "User wants to modify existing interaction",
+        "Pattern matching detected modification keywords",
+    ),
+    "get_interaction_history": (
+        ("show", "history", "past", "previous", "interactions with"),
+        "User wants to see interaction history",
+        "Pattern matching detected history keywords",
+    ),
+    "generate_sales_insights": (
+        ("analyze", "insights", "report", "analytics", "performance"),
+        "User wants analysis or insights",
+        "Pattern matching detected analysis keywords",
+    ),
+    "general_conversation": (
+        ("how does", "what is", "what are", "how do", "explain", "help me understand", "best practices"),
+        "User is asking general questions",
+        "Pattern matching detected general question keywords",
+    ),
+}
+_FALLBACK_RANK = {tool: rank for rank, tool in enumerate(_FALLBACK_RULES)}
+# Each alternative sits in a lookahead so finditer reports a hit at every position
+_FALLBACK_RE = re.compile("(?=(?:" + "|".join(
+    f"(?P<{tool}>{'|'.join(map(re.escape, phrases))})" for tool, (phrases, _, _) in _FALLBACK_RULES.items()
+) + "))")
+
+@lru_cache(maxsize=2048)
+def _fallback_tool(user_lower: str) -> Optional[str]:
+    """Keyword-matched tool for a lowercased query, or None; the mapping is static so it caches forever"""
+    # One scan finds every keyword hit; the earliest rule in _FALLBACK_RULES wins
+    hits = (match.lastgroup for match in _FALLBACK_RE.finditer(user_lower))
+    return min(hits, key=_FALLBACK_RANK.__getitem__, default=None)
+
+class EmbeddingIntentRouter:
+    """Routes queries to the tool with the most similar example, when the match is confident"""
+    
+    def __init__(self, tool_descriptions: Dict[str, Dict[str, Any]]):
+        self.model = SentenceTransformer(_ROUTER_MODEL)
+        examples = [(tool, example) for tool, info in tool_descriptions.items() for example in info["examples"]]
+        self.example_tools = [tool for tool, _ in examples]
+        # Normalized once at startup, so similarity is a single matrix-vector product
+        self.example_embeddings = self.model.encode([example for _, example in examples], normalize_embeddings=True)
+    
+    def route(self, user_query: str) -> Optional[str]:
+        query_embedding = self.model.encode([user_query], normalize_embeddings=True)[0]
+        similarities = (self.example_embeddings @ query_embedding).tolist()
+        
+        # Compare tools by their closest example, so the margin is measured against another tool
+        best_by_tool: Dict[str, float] = {}
+        for tool, similarity in zip(self.example_tools, similarities):
+            best_by_tool[tool] = max(similarity, best_by_tool.get(tool, -1.0))
+        return _confident_tool(best_by_tool)
+
+def _confident_tool(best_by_tool: Dict[str, float]) -> Optional[str]:
+    """The top-scoring tool if it clears the similarity floor and leads the runner-up by the margin"""
+    ranked = sorted(best_by_tool, key=best_by_tool.__getitem__, reverse=True)
+    best, runner_up = best_by_tool[ranked[0]], best_by_tool[ranked[1]]
+    if best >= _ROUTER_MIN_SIMILARITY and best - runner_up >= _ROUTER_MIN_MARGIN:
+        return ranked[0]
+    return None
+
+def _load_json_object(content: str) -> Dict[str, Any]:
+    """Parse a JSON-mode reply, which is a bare JSON object"""
+    value = orjson.loads(content)
+    if not isinstance(value, dict):
+        raise ValueError(f"expected a JSON object, got {type(value).__name__}")
+    return value
+
 class LLMQueryAnalyzer:
     """Uses LLM to analyze user queries and make intelligent tool selection decisions"""
     
     def __init__(self, llm):
         self.llm = llm
+        # Groq's JSON mode: replies are a bare JSON object, no code fences or commentary to strip
+        self.json_llm = llm.bind(response_format={"type": "json_object"})
+        # Analyses depend only on the query text, so near-identical queries reuse them
+        self._analysis_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._analysis_cache_lock = threading.Lock()
         self.tool_descriptions = {
             "log_interaction": {
                 "purpose": "Use when user is describing a NEW interaction they had with an HCP (Healthcare Professional)",
@@ -92,82 +278,75 @@ class LLMQueryAnalyzer:
                 ]
             }
         }
+        # The embedding model is loaded (and possibly downloaded) on the first query
+        # rather than at import, so workers start serving without waiting on it
+        self._router: Optional[EmbeddingIntentRouter] = None
+        self._router_unavailable = SentenceTransformer is None
+        self._router_lock = threading.Lock()
     
-    def analyze_query(self, user_query: str) -> Dict[str, Any]:
+    def _route(self, user_query: str) -> Optional[str]:
+        """Embedding-routed tool for the query, building the router on first use (blocking)"""
+        if self._router is None:
+            with self._router_lock:
+                if self._router is None and not self._router_unavailable:
+                    try:
+                        self._router = EmbeddingIntentRouter(self.tool_descriptions)
+                    except Exception as e:
+                        logger.warning("Embedding router unavailable, routing every query with the LLM: %s", e)
+                        self._router_unavailable = True
+        return self._router.route(user_query) if self._router is not None else None
+    
+    async def analyze_query(self, user_query: str) -> Dict[str, Any]:
         """Use LLM to analyze the user query and determine the best tool to use"""
+        cache_key = _normalize_query(user_query)
         
-        analysis_prompt = f"""
-        You are an AI assistant that helps healthcare sales representatives manage their interactions with Healthcare Professionals (HCPs).
-
-        Analyze this user query and determine which tool would be best to handle it:
-
-        USER QUERY: "{user_query}"
-
-        AVAILABLE TOOLS:
-        1. log_interaction - Use when user is describing a NEW interaction they had with an HCP
-           Examples: "I met with Dr. Smith today", "Had a call with Dr. Johnson"
-        
-        2. edit_interaction - Use when user wants to MODIFY/UPDATE an existing interaction
-           Examples: "Update the meeting with Dr. Smith", "Change the sentiment to positive"
-        
-        3. get_interaction_history - Use when user wants to SEE PAST interactions with an HCP
-           Examples: "Show me interactions with Dr. Smith", "Get history for Dr. Johnson"
+        # Greetings and acknowledgements are answered outright, no LLM call for analysis or reply
+        canned_reply = _CANNED_REPLIES.get(cache_key.lower())
+        if canned_reply is not None:
+            return {
+                "user_intent": "Greeting or small talk",
+                "reasoning": "Recognised as small talk",
+                "selected_tool": "general_conversation",
+                "confidence": "high",
+                "extracted_entities": {},
+                "general_answer": canned_reply
+            }
         
-        4. generate_sales_insights - Use when user wants ANALYSIS/INSIGHTS/REPORTS
-           Examples: "Analyze my performance", "Generate insights for Dr. Smith"
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            # Callers get their own copy, so nothing they change leaks into later hits
+            return copy.deepcopy(cached)
         
-        5. form_information_tool - Use when user wants to CHECK/REVIEW current form data
-           Examples: "What's in the form?", "Show form summary", "Check form status"
-
-        6. general_conversation - Use when user is asking GENERAL QUESTIONS, seeking EXPLANATIONS, or having CASUAL CONVERSATION not related to specific database tasks
-           Examples: "How does the HCP module help pharma reps?", "What is customer relationship management?", "How do I improve my sales performance?", "What are best practices for HCP engagement?"
-
-        Think step by step:
-        1. What is the user trying to accomplish?
-        2. Are they describing a new interaction, wanting to modify an existing one, requesting history, asking for analysis, or asking general questions?
-        3. Which tool best matches their intent?
-
-        IMPORTANT: If the user is asking general questions about concepts, explanations, or casual conversation NOT related to specific database operations, use "general_conversation".
-
-        Return your analysis in JSON format:
-        {{
-            "user_intent": "Brief description of what user wants to do",
-            "reasoning": "Your step-by-step reasoning for tool selection",
-            "selected_tool": "log_interaction|edit_interaction|get_interaction_history|generate_sales_insights|form_information_tool|general_conversation",
-            "confidence": "high|medium|low",
-            "extracted_entities": {{
-                "hcp_name": "HCP name if mentioned (e.g., 'Dr. Smith', 'Neha Singh')",
-                "interaction_type": "meeting|call|email|visit|conference if mentioned",
-                "sentiment": "positive|negative|neutral if mentioned",
-                "date": "date if mentioned (e.g., 'today', '2024-01-15')",
-                "time": "time if mentioned (e.g., '14:50', '2:30 PM', '10:00')",
-                "materials": "materials if mentioned",
-                "samples": "samples if mentioned",
-                "topics": "topics discussed if mentioned",
-                "specific_requests": "any specific modifications or requests"
-            }}
-        }}
-
-        Return only valid JSON, no explanations.
-        """
+        # Embedding the query is CPU work, so it runs off the event loop
+        routed_tool = None if self._router_unavailable else await asyncio.to_thread(self._route, user_query)
+        if routed_tool is not None:
+            analysis = {
+                "user_intent": self.tool_descriptions[routed_tool]["purpose"],
+                "reasoning": "Closely matches the example queries for this tool",
+                "selected_tool": routed_tool,
+                "confidence": "high",
+                "extracted_entities": {}
+            }
+            if routed_tool in _ENTITY_FREE_TOOLS:
+                return analysis
+            
+            # The tool is settled, so the LLM only has to pull out the entities
+            try:
+                analysis["extracted_entities"] = await self._extract_entities(user_query)
+                with self._analysis_cache_lock:
+                    self._analysis_cache[cache_key] = copy.deepcopy(analysis)
+                return analysis
+            except Exception:
+                logger.warning("Error in LLM entity extraction, falling back to full analysis", exc_info=True)
         
         try:
-            response = self.llm.invoke(analysis_prompt)
-            content = response.content.strip()
-            
-            # Clean the response to extract JSON
-            if content.startswith("```json"):
-                content = content[7:-3]
-            elif content.startswith("```"):
-                content = content[3:-3]
-            
-            # Find JSON boundaries
-            start = content.find('{')
-            end = content.rfind('}') + 1
-            if start != -1 and end > start:
-                content = content[start:end]
-            
-            analysis = json.loads(content)
+            query_message = HumanMessage(content=f'USER QUERY: "{user_query}"')
+            response = await self.json_llm.ainvoke([_ANALYSIS_SYSTEM_MESSAGE, query_message])
+            analysis = _load_json_object(response.content)
+            # Only LLM analyses are cached; the pattern-matching fallback is retried next time
+            with self._analysis_cache_lock:
+                self._analysis_cache[cache_key] = copy.deepcopy(analysis)
             return analysis
             
         except Exception as e:
@@ -175,52 +354,15 @@ class LLMQueryAnalyzer:
             # Fallback to simple pattern matching
             return self._fallback_analysis(user_query)
     
+    async def _extract_entities(self, user_query: str) -> Dict[str, Any]:
+        query_message = HumanMessage(content=f'USER QUERY: "{user_query}"')
+        response = await self.json_llm.ainvoke([_ENTITY_SYSTEM_MESSAGE, query_message])
+        return _load_json_object(response.content)
+    
     def _fallback_analysis(self, user_query: str) -> Dict[str, Any]:
         """Fallback analysis using simple pattern matching"""
-        user_lower = user_query.lower()
-        
-        # Simple pattern matching as fallback
-        if any(phrase in user_lower for phrase in ["met with", "had a call", "visited", "spoke with", "discussed with"]):
-            return {
-                "user_intent": "User is describing a new interaction",
-                "reasoning": "Pattern matching detected new interaction keywords",
-                "selected_tool": "log_interaction",
-                "confidence": "medium",
-                "extracted_entities": {}
-            }
-        elif any(phrase in user_lower for phrase in ["update", "edit", "change", "modify", "correct"]):
-            return {
-                "user_intent": "User wants to modify existing interaction",
-                "reasoning": "Pattern matching detected modification keywords",
-                "selected_tool": "edit_interaction",
-                "confidence": "medium",
-                "extracted_entities": {}
-            }
-        elif any(phrase in user_lower for phrase in ["show", "history", "past", "previous", "interactions with"]):
-            return {
-                "user_intent": "User wants to see interaction history",
-                "reasoning": "Pattern matching detected history keywords",
-                "selected_tool": "get_interaction_history",
-                "confidence": "medium",
-                "extracted_entities": {}
-            }
-        elif any(phrase in user_lower for phrase in ["analyze", "insights", "report", "analytics", "performance"]):
-            return {
-                "user_intent": "User wants analysis or insights",
-                "reasoning": "Pattern matching detected analysis keywords",
-                "selected_tool": "generate_sales_insights",
-                "confidence": "medium",
-                "extracted_entities": {}
-            }
-        elif any(phrase in user_lower for phrase in ["how does", "what is", "what are", "how do", "explain", "help me understand", "best practices"]):
-            return {
-                "user_intent": "User is asking general questions",
-                "reasoning": "Pattern matching detected general question keywords",
-                "selected_tool": "general_conversation",
-                "confidence": "medium",
-                "extracted_entities": {}
-            }
-        else:
+        tool = _fallback_tool(user_query.lower())
+        if tool is None:
             return {
                 "user_intent": "Default to logging new interaction",
                 "reasoning": "No clear pattern matched, defaulting to log_interaction",
@@ -228,30 +370,81 @@ class LLMQueryAnalyzer:
                 "confidence": "low",
                 "extracted_entities": {}
             }
+        
+        _, user_intent, reasoning = _FALLBACK_RULES[tool]
+        return {
+            "user_intent": user_intent,
+            "reasoning": reasoning,
+            "selected_tool": tool,
+            "confidence": "medium",
+            "extracted_entities": {}
+        }
+
+# Canned answers for general questions when the LLM is unavailable: the first rule whose
+# words all appear in the query wins
+_WORD_RE = re.compile(r"\w+")
+_GENERAL_FALLBACK_RULES = (
+    (frozenset({"hcp", "help"}), "HCP (Healthcare Professional) interaction management helps pharma reps track their engagements with doctors, build stronger relationships, and plan more effective follow-ups. It enables personalized communication and better understanding of each doctor's needs and preferences."),
+    (frozenset({"crm"}), "Customer Relationship Management (CRM) in healthcare sales helps organize and track all interactions with healthcare professionals, manage contact information, schedule follow-ups, and analyze engagement patterns to improve sales effectiveness."),
+    (frozenset({"sales", "performance"}), "To improve sales performance with HCPs, focus on: 1) Building genuine relationships, 2) Understanding their specific needs, 3) Providing valuable medical information, 4) Following up consistently, 5) Tracking interaction history to personalize future engagements."),
+    (frozenset({"best", "practices"}), "Best practices for HCP engagement include: being respectful of their time, providing scientifically accurate information, following compliance guidelines, maintaining detailed interaction records, and focusing on patient outcomes rather than just product features."),
+)
+_GENERAL_FALLBACK_DEFAULT = "I'm here to help with questions about healthcare sales, HCP engagement, and interaction management. Feel free to ask about best practices, strategies, or how our tools can support your work with healthcare professionals."
+
+# Extracted entity -> edit tool parameter, with the normalization applied to its value
+_EDIT_ENTITY_FIELDS = (
+    ("sentiment", "sentiment", str.title),
+    ("interaction_type", "interaction_type", str.title),
+    ("time", "interaction_time", None),
+    ("date", "interaction_date", None),
+    ("materials", "materials_shared", None),
+    ("samples", "samples_distributed", None),
+    ("topics", "key_discussion_points", None),
+)
+
+# General-conversation prompt around the user's question, kept constant so only the question varies
+_CONVERSATION_PROMPT_PREFIX: Final[str] = """
+        You are a helpful AI assistant for healthcare sales representatives. The user is asking a general question about healthcare sales, CRM, or related topics. 
+        
+        Provide a helpful, informative, and conversational response. Be natural and human-like in your response. 
+        This is NOT a database operation - just answer their question directly as if you were having a conversation.
+        
+        Keep your response concise but informative. Use a friendly, professional tone.
+        
+        USER QUESTION: \""""
+_CONVERSATION_PROMPT_SUFFIX: Final[str] = '"\n        '
 
 class IntelligentToolExecutor:
     """Executes tools based on LLM analysis and extracted parameters"""
     
     def __init__(self, llm):
         self.llm = llm
-        self.tools = {
-            'log_interaction': log_interaction,
-            'edit_interaction': edit_interaction,
-            'edit_interaction_by_name': edit_interaction_by_name,
-            'update_form_field': update_form_field,
-            'get_interaction_history': get_interaction_history,
-            'generate_sales_insights': generate_sales_insights,
-            'form_information_tool': form_information_tool,
-            'general_conversation': self.handle_general_conversation
+        # Tool name -> coroutine function taking the parameters dict. ainvoke awaits the
+        # LLM-bound async tools directly and runs the blocking database ones in a worker thread
+        self._dispatch = {
+            name: tool.ainvoke
+            for name, tool in (
+                ('log_interaction', log_interaction),
+                ('edit_interaction', edit_interaction),
+                ('edit_interaction_by_name', edit_interaction_by_name),
+                ('update_form_field', update_form_field),
+                ('get_interaction_history', get_interaction_history),
+                ('generate_sales_insights', generate_sales_insights),
+                ('form_information_tool', form_information_tool),
+            )
         }
+        self._dispatch['general_conversation'] = self.handle_general_conversation
     
-    def prepare_parameters(self, tool_name: str, query_analysis: Dict[str, Any], user_query: str) -> Dict[str, Any]:
-        """Prepare parameters for the selected tool based on LLM analysis"""
+    def prepare_parameters(self, tool_name: str, query_analysis: Dict[str, Any], user_query: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Prepare parameters for the selected tool based on LLM analysis.
+        Returns the tool to actually run with them - an edit naming an HCP runs edit_interaction_by_name.
+        """
         
         entities = query_analysis.get('extracted_entities', {})
         
         if tool_name == 'log_interaction':
-            return {
+            return tool_name, {
                 'raw_interaction_text': user_query
             }
         
@@ -262,107 +455,85 @@ class IntelligentToolExecutor:
                     'hcp_name_search': entities['hcp_name']
                 }
                 # Add any specific field updates
-                if entities.get('sentiment'):
-                    params['sentiment'] = entities['sentiment'].title()
-                if entities.get('interaction_type'):
-                    params['interaction_type'] = entities['interaction_type'].title()
-                if entities.get('time'):
-                    params['interaction_time'] = entities['time']
-                if entities.get('date'):
-                    params['interaction_date'] = entities['date']
-                if entities.get('materials'):
-                    params['materials_shared'] = entities['materials']
-                if entities.get('samples'):
-                    params['samples_distributed'] = entities['samples']
-                if entities.get('topics'):
-                    params['key_discussion_points'] = entities['topics']
+                for entity, field, normalize in _EDIT_ENTITY_FIELDS:
+                    value = entities.get(entity)
+                    if value:
+                        params[field] = normalize(value) if normalize else value
                 
-                return params
+                return 'edit_interaction_by_name', params
             else:
                 # Default to editing interaction ID 1 if no specific HCP mentioned
-                return {
+                return tool_name, {
                     'interaction_id': 1,
                     'summary': entities.get('specific_requests', user_query)
                 }
         
         elif tool_name == 'get_interaction_history':
-            return {
+            return tool_name, {
                 'hcp_name': entities.get('hcp_name', '')
             }
         
         elif tool_name == 'generate_sales_insights':
-            return {
+            return tool_name, {
                 'hcp_name': entities.get('hcp_name', ''),
                 'period_days': 30
             }
         
         elif tool_name == 'form_information_tool':
-            return {
+            return tool_name, {
                 'form_data': '{}'  # This will be populated by the frontend
             }
         
         elif tool_name == 'general_conversation':
-            return {
+            return tool_name, {
                 'user_query': user_query
             }
         
-        return {}
+        return tool_name, {}
     
-    def handle_general_conversation(self, parameters: Dict[str, Any]) -> str:
+    def _conversation_prompt(self, user_query: str) -> str:
+        return "".join((_CONVERSATION_PROMPT_PREFIX, user_query, _CONVERSATION_PROMPT_SUFFIX))
+    
+    async def handle_general_conversation(self, parameters: Dict[str, Any]) -> str:
         """Handle general conversation questions with human-like responses"""
         user_query = parameters.get('user_query', '')
         
-        conversation_prompt = f"""
-        You are a helpful AI assistant for healthcare sales representatives. The user is asking a general question about healthcare sales, CRM, or related topics. 
-        
-        USER QUESTION: "{user_query}"
-        
-        Provide a helpful, informative, and conversational response. Be natural and human-like in your response. 
-        This is NOT a database operation - just answer their question directly as if you were having a conversation.
-        
-        Keep your response concise but informative. Use a friendly, professional tone.
-        """
-        
         try:
-            response = self.llm.invoke(conversation_prompt)
+            response = await self.llm.ainvoke(self._conversation_prompt(user_query))
             return response.content.strip()
         except Exception as e:
             print(f"Error in general conversation: {e}")
             return self._get_fallback_response(user_query)
     
+    async def stream_general_conversation(self, parameters: Dict[str, Any]) -> AsyncIterator[str]:
+        """Like handle_general_conversation, but yields the reply piece by piece as the LLM writes it"""
+        user_query = parameters.get('user_query', '')
+        
+        streamed = False
+        try:
+            async for chunk in self.llm.astream(self._conversation_prompt(user_query)):
+                if chunk.content:
+                    streamed = True
+                    yield chunk.content
+        except Exception:
+            logger.warning("Error in streamed general conversation", exc_info=True)
+            # Once text has gone out, a canned answer appended to it would read as nonsense
+            if not streamed:
+                yield self._get_fallback_response(user_query)
+    
     def _get_fallback_response(self, user_query: str) -> str:
         """Fallback responses for general questions"""
-        user_lower = user_query.lower()
-        
-        if "hcp" in user_lower and "help" in user_lower:
-            return "HCP (Healthcare Professional) interaction management helps pharma reps track their engagements with doctors, build stronger relationships, and plan more effective follow-ups. It enables personalized communication and better understanding of each doctor's needs and preferences."
-        elif "crm" in user_lower:
-            return "Customer Relationship Management (CRM) in healthcare sales helps organize and track all interactions with healthcare professionals, manage contact information, schedule follow-ups, and analyze engagement patterns to improve sales effectiveness."
-        elif "sales performance" in user_lower:
-            return "To improve sales performance with HCPs, focus on: 1) Building genuine relationships, 2) Understanding their specific needs, 3) Providing valuable medical information, 4) Following up consistently, 5) Tracking interaction history to personalize future engagements."
-        elif "best practices" in user_lower:
-            return "Best practices for HCP engagement include: being respectful of their time, providing scientifically accurate information, following compliance guidelines, maintaining detailed interaction records, and focusing on patient outcomes rather than just product features."
-        else:
-            return "I'm here to help with questions about healthcare sales, HCP engagement, and interaction management. Feel free to ask about best practices, strategies, or how our tools can support your work with healthcare professionals."
+        words = set(_WORD_RE.findall(user_query.lower()))
+        for required_words, response in _GENERAL_FALLBACK_RULES:
+            if required_words <= words:
+                return response
+        return _GENERAL_FALLBACK_DEFAULT
     
-    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> str:
         """Execute the selected tool with prepared parameters"""
         
         try:
-            tool_func = self.tools[tool_name]
-            
-            # Handle different tool execution methods
-            if tool_name == 'edit_interaction' and 'hcp_name_search' in parameters:
-                # Use name-based editing
-                tool_func = self.tools['edit_interaction_by_name']
-                print(f"DEBUG - Using edit_interaction_by_name with parameters: {parameters}")
-            
-            # Handle general conversation differently (it's a method, not a tool)
-            if tool_name == 'general_conversation':
-                result = tool_func(parameters)
-            else:
-                result = tool_func.invoke(parameters)
-            
+            result = await self._dispatch[tool_name](parameters)
             print(f"DEBUG - Tool {tool_name} executed with result: {result}")
             return result
             
@@ -370,15 +541,28 @@ class IntelligentToolExecutor:
             print(f"DEBUG - Tool execution error: {str(e)}")
             return f"Error executing {tool_name}: {str(e)}"
 
+# Groq requests share one keep-alive pool; httpx would otherwise drop idle connections after
+# 5s, so a user pausing between messages paid a fresh TLS handshake on the next one
+_GROQ_REQUEST_TIMEOUT = 15
+_GROQ_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+_groq_http_client = httpx.Client(timeout=_GROQ_REQUEST_TIMEOUT, limits=_GROQ_HTTP_LIMITS)
+_groq_async_http_client = httpx.AsyncClient(timeout=_GROQ_REQUEST_TIMEOUT, limits=_GROQ_HTTP_LIMITS)
+
 # Initialize LLM
 try:
-    if not settings.groq_api_key:
+    if not get_settings().groq_api_key:
         raise ValueError("GROQ_API_KEY is not configured. Please set it in the .env file.")
     
     llm = ChatGroq(
         temperature=0.1,
         model_name="gemma2-9b-it",
-        groq_api_key=settings.groq_api_key
+        groq_api_key=get_settings().groq_api_key,
+        # Identical prompts (same query, same conversation question) skip the Groq round-trip
+        cache=InMemoryCache(maxsize=1024),
+        http_client=_groq_http_client,
+        http_async_client=_groq_async_http_client,
+        max_retries=2,
+        request_timeout=_GROQ_REQUEST_TIMEOUT
     )
     print("✅ Intelligent LangGraph Agent initialized successfully")
 except Exception as e:
@@ -389,61 +573,70 @@ except Exception as e:
 query_analyzer = LLMQueryAnalyzer(llm)
 tool_executor = IntelligentToolExecutor(llm)
 
-# Define the intelligent workflow nodes
-def analyze_query_node(state: IntelligentAgentState) -> IntelligentAgentState:
-    """Use LLM to analyze user query and determine best tool"""
-    user_query = state["messages"][-1].content if state["messages"] else ""
-    
-    # Use LLM to analyze the query
-    analysis = query_analyzer.analyze_query(user_query)
-    
-    return {
-        **state,
-        "user_query": user_query,
-        "query_analysis": analysis
-    }
+@dataclass
+class _PreparedQuery:
+    """Per-request pipeline context between analysis and tool execution"""
+    # Declared by hand, as dataclass(slots=True) needs Python 3.10
+    __slots__ = ("user_query", "analysis", "tool", "parameters")
+    user_query: str
+    analysis: Dict[str, Any]
+    tool: str
+    parameters: Dict[str, Any]
 
-def select_tool_node(state: IntelligentAgentState) -> IntelligentAgentState:
-    """Select tool and prepare parameters based on LLM analysis"""
-    analysis = state["query_analysis"]
-    selected_tool = analysis.get("selected_tool", "log_interaction")
-    
-    # Prepare parameters for the selected tool
-    parameters = tool_executor.prepare_parameters(selected_tool, analysis, state["user_query"])
+async def _analyze_and_prepare(user_query: str) -> _PreparedQuery:
+    """Use the LLM to analyze the query, then pick the tool and prepare its parameters"""
+    analysis = await query_analyzer.analyze_query(user_query)
+    selected_tool, parameters = tool_executor.prepare_parameters(
+        analysis.get("selected_tool", "log_interaction"), analysis, user_query
+    )
     
     print(f"DEBUG - Selected tool: {selected_tool}")
     print(f"DEBUG - Prepared parameters: {parameters}")
     print(f"DEBUG - Extracted entities: {analysis.get('extracted_entities', {})}")
     
-    return {
-        **state,
-        "selected_tool": selected_tool,
-        "tool_parameters": parameters
-    }
+    return _PreparedQuery(user_query, analysis, selected_tool, parameters)
 
-def execute_tool_node(state: IntelligentAgentState) -> IntelligentAgentState:
-    """Execute the selected tool with prepared parameters"""
-    
+def _prepared_general_answer(analysis: Dict[str, Any]) -> Optional[str]:
+    """A confident analysis may already carry the answer to a general question - no second LLM call"""
+    if analysis.get("confidence") == "high" and analysis.get("general_answer"):
+        return analysis["general_answer"].strip()
+    return None
+
+async def _execute_prepared(prepared: _PreparedQuery, form_data: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    """Run the selected tool and turn its result into a user-friendly response"""
     # If using form information tool, pass the form data
-    if state["selected_tool"] == "form_information_tool":
-        import json
-        form_data_str = json.dumps(state.get("form_data", {}))
-        state["tool_parameters"]["form_data"] = form_data_str
+    if prepared.tool == "form_information_tool":
+        prepared.parameters["form_data"] = orjson.dumps(form_data).decode()
     
-    # Execute the tool
-    result = tool_executor.execute_tool(state["selected_tool"], state["tool_parameters"])
+    result = _prepared_general_answer(prepared.analysis) if prepared.tool == "general_conversation" else None
+    if result is None:
+        result = await tool_executor.execute_tool(prepared.tool, prepared.parameters)
     
-    # Create user-friendly response
-    analysis = state["query_analysis"]
-    friendly_response = _create_intelligent_response(result, state["selected_tool"], analysis)
+    return _create_intelligent_response(result, prepared.tool, prepared.analysis)
+
+# The pipeline is linear (analyze -> select tool -> execute), so it runs as a single node and
+# returns only the keys it sets instead of copying the whole state at every step
+async def process_query_node(state: IntelligentAgentState) -> Dict[str, Any]:
+    """Analyze the user query with the LLM, then select, prepare and execute the best tool"""
+    user_query = state["messages"][-1].content if state["messages"] else ""
+    prepared = await _analyze_and_prepare(user_query)
+    tool_result = await _execute_prepared(prepared, state.get("form_data", {}))
     
+    # The TypedDict state only materializes here, at the LangGraph boundary
     return {
-        **state,
-        "tool_result": friendly_response
+        "user_query": prepared.user_query,
+        "query_analysis": prepared.analysis,
+        "selected_tool": prepared.tool,
+        "tool_parameters": prepared.parameters,
+        "tool_result": tool_result
     }
 
-def _create_intelligent_response(tool_result: str, tool_name: str, analysis: Dict[str, Any]) -> str:
-    """Create intelligent, context-aware responses based on tool results"""
+def _create_intelligent_response(tool_result: str, tool_name: str, analysis: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    """
+    Create intelligent, context-aware responses based on tool results.
+    Form population payloads are returned as the parsed dict so they reach the
+    API layer without another encode/decode round-trip.
+    """
     
     user_intent = analysis.get("user_intent", "")
     confidence = analysis.get("confidence", "medium")
@@ -456,16 +649,15 @@ def _create_intelligent_response(tool_result: str, tool_name: str, analysis: Dic
     if tool_name == 'log_interaction':
         # Handle JSON response from form population
         try:
-            import json
-            result_data = json.loads(tool_result)
+            result_data = orjson.loads(tool_result)
             if result_data.get("response_type") == "FORM_POPULATE":
-                # Return the JSON response directly for form population
-                return tool_result
+                # Return the parsed payload directly for form population
+                return result_data
             elif result_data.get("response_type") == "ERROR":
                 return f"I understood you were describing a new interaction, but {result_data.get('message', 'encountered an error')}{confidence_note}"
             else:
                 return f"Perfect! I understood you were describing a new interaction. {result_data.get('message', 'Interaction processed successfully')}{confidence_note}"
-        except (json.JSONDecodeError, KeyError):
+        except (orjson.JSONDecodeError, KeyError):
             if "✅" in tool_result:
                 return f"Perfect! I understood you were describing a new interaction. {tool_result.replace('✅', '').strip()}{confidence_note}"
             else:
@@ -505,20 +697,38 @@ def _create_intelligent_response(tool_result: str, tool_name: str, analysis: Dic
 intelligent_workflow = StateGraph(IntelligentAgentState)
 
 # Add nodes
-intelligent_workflow.add_node("analyze_query", analyze_query_node)
-intelligent_workflow.add_node("select_tool", select_tool_node)
-intelligent_workflow.add_node("execute_tool", execute_tool_node)
+intelligent_workflow.add_node("process_query", process_query_node)
 
 # Define the workflow
-intelligent_workflow.set_entry_point("analyze_query")
-intelligent_workflow.add_edge("analyze_query", "select_tool")
-intelligent_workflow.add_edge("select_tool", "execute_tool")
-intelligent_workflow.add_edge("execute_tool", END)
+intelligent_workflow.set_entry_point("process_query")
+intelligent_workflow.add_edge("process_query", END)
 
 # Compile the intelligent workflow
 intelligent_app = intelligent_workflow.compile()
 
-def process_intelligent_user_input(user_input: str, form_data: dict = None) -> str:
+# Exact-match response cache. Only tools whose answer depends on nothing but the
+# message and form data are cached - edits write to the database and history /
+# insights read it, so those always run. Low/medium confidence analyses (which
+# include the pattern-matching fallback used when the LLM is unreachable) are
+# never cached. Keys include the current date, since log_interaction resolves
+# "today" / "yesterday" in the message to concrete dates.
+_CACHEABLE_TOOLS = frozenset({"log_interaction", "form_information_tool", "general_conversation"})
+_response_cache = TTLCache(maxsize=1024, ttl=3600)
+_response_cache_lock = threading.Lock()
+
+def _response_cache_key(user_input: str, form_data: dict = None) -> str:
+    payload = orjson.dumps(
+        {"m": user_input, "f": form_data or {}, "d": date.today()}, option=orjson.OPT_SORT_KEYS, default=str
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+def _as_response(tool_result: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Form payloads arrive as dicts, everything else is a conversational reply"""
+    if isinstance(tool_result, dict):
+        return tool_result
+    return {"response_type": "MESSAGE", "message": tool_result or "I'm not sure how to help with that request."}
+
+async def process_intelligent_user_input(user_input: str, form_data: dict = None) -> Dict[str, Any]:
     """
     Process user input through the intelligent AI agent with LLM-based decision making.
     
@@ -529,21 +739,27 @@ def process_intelligent_user_input(user_input: str, form_data: dict = None) -> s
     4. Provides context-aware responses
     
     The agent understands natural language and thinks before acting!
+    
+    Always returns a dict with a "response_type" field:
+    - FORM_POPULATE / FORM_UPDATE: structured form payloads produced by the tools
+    - MESSAGE: a conversational reply in "message"
+    - ERROR: the agent failed, "message" explains why
     """
+    cache_key = _response_cache_key(user_input, form_data)
+    with _response_cache_lock:
+        cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        # Create initial state
+        # Create initial state; the node derives user_query from the message and sets the rest
         initial_state = {
             "messages": [HumanMessage(content=user_input)],
-            "user_query": user_input,
-            "query_analysis": {},
-            "selected_tool": "",
-            "tool_parameters": {},
-            "tool_result": "",
             "form_data": form_data or {}
         }
         
         # Process through the intelligent workflow
-        result = intelligent_app.invoke(initial_state)
+        result = await intelligent_app.ainvoke(initial_state)
         
         # Debug output
         print(f"DEBUG - Input: {user_input}")
@@ -552,12 +768,47 @@ def process_intelligent_user_input(user_input: str, form_data: dict = None) -> s
         print(f"DEBUG - Parameters: {result.get('tool_parameters', {})}")
         print(f"DEBUG - Tool Result: {result.get('tool_result', 'no result')}")
         
-        # Return the tool result
-        return result.get("tool_result", "I'm not sure how to help with that request.")
+        selected_tool = result.get("selected_tool")
+        response = _as_response(result.get("tool_result"))
+        
+        if selected_tool in _CACHEABLE_TOOLS and result.get("query_analysis", {}).get("confidence") == "high":
+            with _response_cache_lock:
+                _response_cache[cache_key] = response
+        
+        return response
         
     except Exception as e:
         print(f"DEBUG - Error: {str(e)}")
-        return f"I encountered an error while processing your request: {str(e)}"
+        return {
+            "response_type": "ERROR",
+            "message": f"I encountered an error while processing your request: {str(e)}"
+        }
+
+async def stream_intelligent_user_input(user_input: str, form_data: dict = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming counterpart of process_intelligent_user_input.
+    
+    General conversation replies are yielded as MESSAGE_CHUNK dicts while the LLM is still
+    generating them, so the first words show up after the first chunk instead of the whole
+    answer. Every other tool needs its complete result (form payloads, database output), so
+    it yields a single response shaped exactly like process_intelligent_user_input's.
+    """
+    try:
+        prepared = await _analyze_and_prepare(user_input)
+        
+        if prepared.tool == "general_conversation" and _prepared_general_answer(prepared.analysis) is None:
+            async for text in tool_executor.stream_general_conversation(prepared.parameters):
+                yield {"response_type": "MESSAGE_CHUNK", "message": text}
+            return
+        
+        yield _as_response(await _execute_prepared(prepared, form_data or {}))
+        
+    except Exception as e:
+        logger.exception("Error in streaming intelligent agent")
+        yield {
+            "response_type": "ERROR",
+            "message": f"I encountered an error while processing your request: {str(e)}"
+        }
 
 # Intelligent agent description
 INTELLIGENT_AGENT_DESCRIPTION = """
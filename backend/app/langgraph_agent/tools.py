@@ -1,18 +1,121 @@
-from typing import Literal, List, Dict, Optional
+from typing import Any, Literal, List, Dict, Optional
 from langchain_core.tools import tool
 from langchain_groq import ChatGroq
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 from datetime import datetime, date, timedelta
+from functools import lru_cache
+import asyncio
+import httpx
 import json
+import orjson
 import re
-from ..db.database import SessionLocal
+from ..db.database import ScopedSession
 from ..db import models
-from ..core.config import settings
+from ..core.config import get_settings
+
+# Time expressions, compiled once at import
+_TIME_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(\d{1,2}):(\d{2})\s*(am|pm)?',  # 9:15, 4:10 PM
+    r'(\d{1,2})\s*(am|pm)',          # 9 AM, 4 PM
+    r'around\s+(\d{1,2})',           # around 9
+    r'about\s+(\d{1,2})',            # about 3
+    r'at\s+(\d{1,2})',               # at 9
+))
+# Without a period to anchor it, a bare number is also read as an hour
+_STANDALONE_TIME_PATTERNS = _TIME_PATTERNS + (re.compile(r'^(\d{1,2})$'),)  # just "9"
+
+# Time period mappings to approximate times
+_TIME_PERIODS = {
+    # Early periods
+    'early morning': '07:00',
+    'dawn': '06:00',
+    'sunrise': '06:30',
+    
+    # Morning periods
+    'morning': '09:00',
+    'mid morning': '10:30',
+    'mid-morning': '10:30',
+    'late morning': '11:30',
+    
+    # Noon and lunch
+    'noon': '12:00',
+    'midday': '12:00',
+    'lunch': '12:30',
+    'lunch time': '12:30',
+    'lunchtime': '12:30',
+    
+    # Afternoon periods
+    'afternoon': '14:00',
+    'early afternoon': '13:30',
+    'mid afternoon': '15:00',
+    'mid-afternoon': '15:00',
+    'late afternoon': '16:30',
+    
+    # Evening periods
+    'evening': '18:00',
+    'early evening': '17:30',
+    'late evening': '20:00',
+    'dinner': '19:00',
+    'dinner time': '19:00',
+    'dinnertime': '19:00',
+    
+    # Night periods
+    'night': '21:00',
+    'late night': '23:00',
+    'midnight': '00:00',
+    'mid night': '00:00',
+    'mid-night': '00:00',
+    
+    # Work periods
+    'start of day': '08:00',
+    'end of day': '17:00',
+    'close of business': '17:00',
+    'business hours': '14:00'
+}
+
+# Longest first, so "late afternoon" wins over "afternoon"; sorted once here rather than per call
+_PERIODS_LONGEST_FIRST = sorted(_TIME_PERIODS.items(), key=lambda x: len(x[0]), reverse=True)
+_PERIOD_RANK = {period: rank for rank, (period, _) in enumerate(_PERIODS_LONGEST_FIRST)}
+# One scan finds every period at every offset (the lookahead lets matches overlap);
+# the lowest-ranked hit is the one the longest-first substring check used to pick
+_PERIOD_RE = re.compile('(?=(' + '|'.join(re.escape(period) for period, _ in _PERIODS_LONGEST_FIRST) + '))')
+# Periods that decide whether an hour given without am/pm is morning or afternoon/evening
+_AM_PERIODS = frozenset({'morning', 'early morning', 'dawn', 'sunrise', 'mid morning', 'mid-morning', 'late morning'})
+_PM_PERIODS = frozenset({'afternoon', 'early afternoon', 'mid afternoon', 'mid-afternoon', 'late afternoon', 'evening', 'early evening', 'late evening', 'night', 'late night', 'dinner', 'dinner time', 'dinnertime'})
+
+# Calendar dates in the formats strptime used to be tried with, in order of preference:
+# %Y-%m-%d (optionally %H:%M:%S), %m/%d/%Y, %d/%m/%Y, %B/%b %d, %Y, %d-%m-%Y, %m-%d-%Y.
+# Month and day fields accept exactly what strptime's own patterns do.
+_MONTH_NAMES = ('january', 'february', 'march', 'april', 'may', 'june',
+                'july', 'august', 'september', 'october', 'november', 'december')
+_MONTH_NUMBERS = {**{name[:3]: number for number, name in enumerate(_MONTH_NAMES, 1)},
+                  **{name: number for number, name in enumerate(_MONTH_NAMES, 1)}}
+_MONTH = r'1[0-2]|0[1-9]|[1-9]'
+_DAY = r'3[01]|[12]\d|0[1-9]| ?[1-9]'
+_DATE_RE = re.compile(
+    rf'(?P<iso_y>\d{{4}})-(?P<iso_m>{_MONTH})-(?P<iso_d>{_DAY})(?:\s+(?:2[0-3]|[01]\d|\d):(?:[0-5]\d|\d):(?:[0-5]\d|\d))?'
+    rf'|(?P<us_m>{_MONTH})/(?P<us_d>{_DAY})/(?P<us_y>\d{{4}})'
+    rf'|(?P<eu_d>{_DAY})/(?P<eu_m>{_MONTH})/(?P<eu_y>\d{{4}})'
+    rf'|(?P<name_m>{"|".join(sorted(_MONTH_NUMBERS, key=len, reverse=True))})\s+(?P<name_d>{_DAY}),\s+(?P<name_y>\d{{4}})'
+    rf'|(?P<dash_eu_d>{_DAY})-(?P<dash_eu_m>{_MONTH})-(?P<dash_eu_y>\d{{4}})'
+    rf'|(?P<dash_us_m>{_MONTH})-(?P<dash_us_d>{_DAY})-(?P<dash_us_y>\d{{4}})'
+)
+_DATE_FIELDS = tuple((f'{form}_y', f'{form}_m', f'{form}_d') for form in ('iso', 'us', 'eu', 'name', 'dash_eu', 'dash_us'))
+
+_HCP_NAME_RE = re.compile(r'Dr\.?\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+# Keyword cues for the rule-based extraction fallback (plain substrings, so "materials" counts too).
+# One scan collects every cue category present; the lookahead lets cues overlap ("samplexcited")
+_FALLBACK_CUE_RE = re.compile(
+    '(?=(?P<meeting>meeting)|(?P<material>material)|(?P<sample>sample)|(?P<positive>excited|positive|successful|agreed))',
+    re.IGNORECASE,
+)
 
 def get_db_session():
     """Helper function to get database session"""
-    return SessionLocal()
+    return ScopedSession()
 
+@lru_cache(maxsize=1024)
 def parse_time_intelligently(time_text: str) -> str:
     """
     Comprehensive time parsing function that handles various time expressions:
@@ -30,114 +133,50 @@ def parse_time_intelligently(time_text: str) -> str:
     
     time_text = time_text.lower().strip()
     
-    # Time period mappings to approximate times
-    time_periods = {
-        # Early periods
-        'early morning': '07:00',
-        'dawn': '06:00',
-        'sunrise': '06:30',
-        
-        # Morning periods
-        'morning': '09:00',
-        'mid morning': '10:30',
-        'mid-morning': '10:30',
-        'late morning': '11:30',
-        
-        # Noon and lunch
-        'noon': '12:00',
-        'midday': '12:00',
-        'lunch': '12:30',
-        'lunch time': '12:30',
-        'lunchtime': '12:30',
-        
-        # Afternoon periods
-        'afternoon': '14:00',
-        'early afternoon': '13:30',
-        'mid afternoon': '15:00',
-        'mid-afternoon': '15:00',
-        'late afternoon': '16:30',
-        
-        # Evening periods
-        'evening': '18:00',
-        'early evening': '17:30',
-        'late evening': '20:00',
-        'dinner': '19:00',
-        'dinner time': '19:00',
-        'dinnertime': '19:00',
-        
-        # Night periods
-        'night': '21:00',
-        'late night': '23:00',
-        'midnight': '00:00',
-        'mid night': '00:00',
-        'mid-night': '00:00',
-        
-        # Work periods
-        'start of day': '08:00',
-        'end of day': '17:00',
-        'close of business': '17:00',
-        'business hours': '14:00'
-    }
+    # A bare hour ("9") is the most common reply; read it without any pattern work
+    if len(time_text) <= 2 and time_text.isdecimal():
+        return f"{int(time_text):02d}:00"
     
-    # Check for exact period matches first (sort by length to match longest first)
-    sorted_periods = sorted(time_periods.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for period, default_time in sorted_periods:
-        if period in time_text:
-            # Look for specific times mentioned with the period
-            time_patterns = [
-                r'(\d{1,2}):(\d{2})\s*(am|pm)?',
-                r'(\d{1,2})\s*(am|pm)',
-                r'around\s+(\d{1,2})',
-                r'about\s+(\d{1,2})',
-                r'at\s+(\d{1,2})'
-            ]
-            
-            for pattern in time_patterns:
-                match = re.search(pattern, time_text)
-                if match:
-                    if ':' in match.group(0):
-                        # Handle HH:MM format
-                        hour = int(match.group(1))
-                        minute = int(match.group(2))
-                        am_pm = match.group(3) if len(match.groups()) >= 3 and match.group(3) else None
-                    else:
-                        # Handle single hour
-                        hour = int(match.group(1))
-                        minute = 0
-                        am_pm = match.group(2) if len(match.groups()) >= 2 and match.group(2) else None
-                    
-                    # Apply AM/PM conversion
-                    if am_pm:
-                        if am_pm.lower() == 'pm' and hour != 12:
-                            hour += 12
-                        elif am_pm.lower() == 'am' and hour == 12:
-                            hour = 0
-                    else:
-                        # Infer AM/PM based on period context
-                        if period in ['morning', 'early morning', 'dawn', 'sunrise', 'mid morning', 'mid-morning', 'late morning']:
-                            if hour > 12:
-                                hour = hour - 12  # Convert from 24h if needed
-                        elif period in ['afternoon', 'early afternoon', 'mid afternoon', 'mid-afternoon', 'late afternoon', 'evening', 'early evening', 'late evening', 'night', 'late night', 'dinner', 'dinner time', 'dinnertime'] and hour < 12:
-                            hour += 12
-                    
-                    return f"{hour:02d}:{minute:02d}"
-            
-            # No specific time found, return default for period
-            return default_time
+    # Check for exact period matches first (longest first)
+    period = min((match.group(1) for match in _PERIOD_RE.finditer(time_text)), key=_PERIOD_RANK.__getitem__, default=None)
+    if period is not None:
+        # Look for specific times mentioned with the period
+        for pattern in _TIME_PATTERNS:
+            match = pattern.search(time_text)
+            if match:
+                if ':' in match.group(0):
+                    # Handle HH:MM format
+                    hour = int(match.group(1))
+                    minute = int(match.group(2))
+                    am_pm = match.group(3) if len(match.groups()) >= 3 and match.group(3) else None
+                else:
+                    # Handle single hour
+                    hour = int(match.group(1))
+                    minute = 0
+                    am_pm = match.group(2) if len(match.groups()) >= 2 and match.group(2) else None
+                
+                # Apply AM/PM conversion
+                if am_pm:
+                    if am_pm.lower() == 'pm' and hour != 12:
+                        hour += 12
+                    elif am_pm.lower() == 'am' and hour == 12:
+                        hour = 0
+                else:
+                    # Infer AM/PM based on period context
+                    if period in _AM_PERIODS:
+                        if hour > 12:
+                            hour = hour - 12  # Convert from 24h if needed
+                    elif period in _PM_PERIODS and hour < 12:
+                        hour += 12
+                
+                return f"{hour:02d}:{minute:02d}"
+        
+        # No specific time found, return default for period
+        return _TIME_PERIODS[period]
     
     # Handle standalone time expressions without period context
-    time_patterns = [
-        r'(\d{1,2}):(\d{2})\s*(am|pm)?',  # 9:15, 4:10 PM
-        r'(\d{1,2})\s*(am|pm)',          # 9 AM, 4 PM
-        r'around\s+(\d{1,2})',           # around 9
-        r'about\s+(\d{1,2})',            # about 3
-        r'at\s+(\d{1,2})',               # at 9
-        r'^(\d{1,2})$'                   # just "9"
-    ]
-    
-    for pattern in time_patterns:
-        match = re.search(pattern, time_text)
+    for pattern in _STANDALONE_TIME_PATTERNS:
+        match = pattern.search(time_text)
         if match:
             if ':' in match.group(0):
                 # Handle HH:MM format
@@ -177,53 +216,68 @@ def parse_date_flexibly(date_input: str) -> date:
     elif date_str == 'tomorrow':
         return datetime.now().date() + timedelta(days=1)
     
-    # Try different date formats
-    formats = [
-        "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S",
-        "%B %d, %Y", "%b %d, %Y", "%d-%m-%Y", "%m-%d-%Y",
-    ]
-    
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt).date()
-        except ValueError:
-            continue
+    parsed = _parse_calendar_date(date_str)
+    if parsed is not None:
+        return parsed
     
     # If no format matches, return today
     print(f"Warning: Could not parse date '{date_input}', using today's date")
     return datetime.now().date()
 
+@lru_cache(maxsize=1024)
+def _parse_calendar_date(date_str: str) -> Optional[date]:
+    """Parse an absolute date; relative words and the today fallback stay with the caller since they depend on the clock"""
+    # Match all supported formats in one pass
+    match = _DATE_RE.fullmatch(date_str)
+    if match:
+        for year_group, month_group, day_group in _DATE_FIELDS:
+            if match.group(year_group) is not None:
+                month = match.group(month_group)
+                try:
+                    return date(int(match.group(year_group)), _MONTH_NUMBERS.get(month) or int(month), int(match.group(day_group)))
+                except ValueError:
+                    break  # e.g. February 30th
+    return None
+
+@lru_cache(maxsize=1)
 def get_llm():
-    """Initialize LLM for agent tools"""
-    if not settings.groq_api_key:
+    """
+    LLM for agent tools, built on first use and then shared so every tool call
+    reuses the same keep-alive connection pool to Groq
+    """
+    if not get_settings().groq_api_key:
         raise ValueError("GROQ_API_KEY is not configured. Please set it in the .env file.")
     
     try:
+        limits = httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
         llm = ChatGroq(
             temperature=0.1, 
             model_name="gemma2-9b-it", 
-            groq_api_key=settings.groq_api_key
+            groq_api_key=get_settings().groq_api_key,
+            http_client=httpx.Client(limits=limits),
+            http_async_client=httpx.AsyncClient(limits=limits)
         )
         return llm
     except Exception as e:
         print(f"❌ Error initializing LLM: {e}")
         raise
 
-def extract_entities_and_summarize(raw_text: str) -> Dict[str, str]:
-    """Use LLM to extract entities and create summary from raw interaction text"""
-    llm = get_llm()
-    
-    # Extract HCP names using simple pattern matching as backup
-    import re
-    hcp_names = re.findall(r'Dr\.?\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', raw_text)
-    primary_hcp = hcp_names[0] if hcp_names else ""
-    
-    extraction_prompt = f"""
+_JSON_DECODER = json.JSONDecoder()
+
+def _parse_json_reply(content: str):
+    """Parse the JSON object in an LLM reply, skipping any prose before it and ignoring anything after it"""
+    start = content.find('{')
+    if start == -1:
+        return json.loads(content)
+    return _JSON_DECODER.raw_decode(content, start)[0]
+
+# Entity-extraction prompt; the interaction text (first 1000 chars) is the only substitution
+_EXTRACTION_PROMPT = """
     Analyze this sales interaction text and extract information. Return ONLY a valid JSON object:
     
-    Text: "{raw_text[:1000]}..."
+    Text: "%s..."
     
-    {{
+    {
         "hcp_name": "Primary HCP name (e.g., Dr. Sarah Mitchell)",
         "interaction_type": "Meeting, Call, Email, Visit, or Conference",
         "interaction_date": "today",
@@ -235,7 +289,7 @@ def extract_entities_and_summarize(raw_text: str) -> Dict[str, str]:
         "samples_distributed": "Samples given",
         "sentiment": "Positive, Neutral, or Negative",
         "follow_up_actions": "Next steps mentioned"
-    }}
+    }
     
     For interaction_time, capture the full time context including:
     - Exact times: "9:15", "4:10 PM", "14:30"
@@ -245,9 +299,19 @@ def extract_entities_and_summarize(raw_text: str) -> Dict[str, str]:
     
     Return only the JSON object, no explanations.
     """
+
+async def extract_entities_and_summarize(raw_text: str) -> Dict[str, str]:
+    """Use LLM to extract entities and create summary from raw interaction text"""
+    llm = get_llm()
+    
+    # Extract HCP names using simple pattern matching as backup
+    hcp_names = _HCP_NAME_RE.findall(raw_text)
+    primary_hcp = hcp_names[0] if hcp_names else ""
+    
+    extraction_prompt = _EXTRACTION_PROMPT % raw_text[:1000]
     
     try:
-        response = llm.invoke(extraction_prompt)
+        response = await llm.ainvoke(extraction_prompt)
         content = response.content.strip()
         
         # Clean the response to extract JSON
@@ -256,13 +320,7 @@ def extract_entities_and_summarize(raw_text: str) -> Dict[str, str]:
         elif content.startswith("```"):
             content = content[3:-3]
         
-        # Find JSON boundaries
-        start = content.find('{')
-        end = content.rfind('}') + 1
-        if start != -1 and end > start:
-            content = content[start:end]
-        
-        extracted_data = json.loads(content)
+        extracted_data = _parse_json_reply(content)
         
         # Ensure we have an HCP name
         if not extracted_data.get("hcp_name") and primary_hcp:
@@ -273,22 +331,23 @@ def extract_entities_and_summarize(raw_text: str) -> Dict[str, str]:
     except Exception as e:
         print(f"Error in entity extraction: {e}")
         # Enhanced fallback with pattern matching
+        cues = {match.lastgroup for match in _FALLBACK_CUE_RE.finditer(raw_text)}
         return {
             "hcp_name": f"Dr. {primary_hcp}" if primary_hcp else "",
-            "interaction_type": "Meeting" if "meeting" in raw_text.lower() else "Other",
+            "interaction_type": "Meeting" if "meeting" in cues else "Other",
             "interaction_date": "today",
             "interaction_time": "",
             "attendees": ", ".join([f"Dr. {name}" for name in hcp_names[1:3]]) if len(hcp_names) > 1 else "",
             "summary": raw_text[:200] + "..." if len(raw_text) > 200 else raw_text,
             "key_discussion_points": raw_text[:500] + "..." if len(raw_text) > 500 else raw_text,
-            "materials_shared": "clinical materials" if "material" in raw_text.lower() else "",
-            "samples_distributed": "sample kits" if "sample" in raw_text.lower() else "",
-            "sentiment": "Positive" if any(word in raw_text.lower() for word in ["excited", "positive", "successful", "agreed"]) else "Neutral",
+            "materials_shared": "clinical materials" if "material" in cues else "",
+            "samples_distributed": "sample kits" if "sample" in cues else "",
+            "sentiment": "Positive" if "positive" in cues else "Neutral",
             "follow_up_actions": ""
         }
 
 @tool
-def log_interaction(raw_interaction_text: str) -> str:
+async def log_interaction(raw_interaction_text: str) -> str:
     """
     Tool 1: Log Interaction (Form Population)
     
@@ -301,15 +360,15 @@ def log_interaction(raw_interaction_text: str) -> str:
     """
     try:
         # Use LLM to extract structured data from raw text
-        extracted_data = extract_entities_and_summarize(raw_interaction_text)
+        extracted_data = await extract_entities_and_summarize(raw_interaction_text)
         
         # Get HCP name from extracted data
         hcp_name = extracted_data.get("hcp_name", "").strip()
         if not hcp_name:
-            return json.dumps({
+            return orjson.dumps({
                 "response_type": "ERROR",
                 "message": "Could not identify HCP from the interaction text. Please specify the HCP name more clearly."
-            })
+            }).decode()
         
         # Create field updates for form population
         field_updates = []
@@ -389,17 +448,41 @@ def log_interaction(raw_interaction_text: str) -> str:
             })
         
         # Return JSON response for form population
-        return json.dumps({
+        return orjson.dumps({
             "response_type": "FORM_POPULATE",
             "field_updates": field_updates,
             "message": f"Perfect! I've populated the form with information about your interaction with {hcp_name}. Please review and submit when ready."
-        })
+        }).decode()
         
     except Exception as e:
-        return json.dumps({
+        return orjson.dumps({
             "response_type": "ERROR",
             "message": f"❌ Error analyzing interaction: {str(e)}"
-        })
+        }).decode()
+
+def update_interaction_fields(db: Session, interaction_id: int, interaction_date: str = None, interaction_time: str = None, **fields) -> bool:
+    """
+    Write the provided fields to one interaction in a single UPDATE, leaving empty ones untouched.
+    A new date or time moves interaction_at, keeping whichever half was not given.
+    Returns False when the interaction does not exist.
+    """
+    values = {name: value for name, value in fields.items() if value}
+    if interaction_date or interaction_time:
+        new_date = parse_date_flexibly(interaction_date) if interaction_date else None
+        new_time = parse_time_intelligently(interaction_time) if interaction_time else ""
+        if new_date is None or not new_time:
+            # Date and time share one column, so the missing half has to be read first
+            current = db.get(models.Interaction, interaction_id)
+            if current is None:
+                return False
+            new_date = new_date or current.interaction_date
+            new_time = new_time or current.interaction_time
+        values["interaction_at"] = models.interaction_timestamp(new_date, new_time)
+    
+    query = db.query(models.Interaction).filter(models.Interaction.id == interaction_id)
+    if not values:
+        return db.query(query.exists()).scalar()
+    return query.update(values, synchronize_session=False) > 0
 
 @tool
 def edit_interaction(
@@ -424,33 +507,21 @@ def edit_interaction(
     """
     db = get_db_session()
     try:
-        interaction = db.query(models.Interaction).filter(models.Interaction.id == interaction_id).first()
-        if not interaction:
-            return f"Interaction with ID {interaction_id} not found."
-        
         # Update fields if provided
-        if hcp_name:
-            interaction.hcp_name = hcp_name
-        if interaction_date:
-            interaction.interaction_date = parse_date_flexibly(interaction_date)
-        if interaction_time:
-            interaction.interaction_time = interaction_time
-        if interaction_type:
-            interaction.interaction_type = interaction_type
-        if attendees:
-            interaction.attendees = attendees
-        if summary:
-            interaction.summary = summary
-        if key_discussion_points:
-            interaction.key_discussion_points = key_discussion_points
-        if materials_shared:
-            interaction.materials_shared = materials_shared
-        if samples_distributed:
-            interaction.samples_distributed = samples_distributed
-        if sentiment:
-            interaction.sentiment = sentiment
-        if follow_up_actions:
-            interaction.follow_up_actions = follow_up_actions
+        found = update_interaction_fields(
+            db, interaction_id, interaction_date, interaction_time,
+            hcp_name=hcp_name,
+            interaction_type=interaction_type,
+            attendees=attendees,
+            summary=summary,
+            key_discussion_points=key_discussion_points,
+            materials_shared=materials_shared,
+            samples_distributed=samples_distributed,
+            sentiment=sentiment,
+            follow_up_actions=follow_up_actions,
+        )
+        if not found:
+            return f"Interaction with ID {interaction_id} not found."
         
         db.commit()
         return f"✅ Successfully updated interaction ID {interaction_id}"
@@ -482,10 +553,13 @@ def edit_interaction_by_name(
     """
     db = get_db_session()
     try:
-        # Search for interactions with the HCP name (case-insensitive partial match)
-        interactions = db.query(models.Interaction).filter(
+        # Search for interactions with the HCP name (case-insensitive partial match).
+        # At most the 10 listed below are needed, and only the columns that listing shows
+        interactions = db.query(models.Interaction).options(
+            load_only(models.Interaction.id, models.Interaction.hcp_name, models.Interaction.interaction_at)
+        ).filter(
             models.Interaction.hcp_name.ilike(f"%{hcp_name_search}%")
-        ).order_by(models.Interaction.created_at.desc()).all()
+        ).order_by(models.Interaction.created_at.desc()).limit(10).all()
         
         if not interactions:
             return f"No interactions found for HCP name containing '{hcp_name_search}'."
@@ -494,43 +568,89 @@ def edit_interaction_by_name(
             # Show available interactions and ask for ID selection
             interaction_list = "\n".join([
                 f"  - ID {int.id}: {int.hcp_name} on {int.interaction_date} at {int.interaction_time or 'N/A'}"
-                for int in interactions[:10]  # Show first 10
+                for int in interactions
             ])
             return f"Multiple interactions found for '{hcp_name_search}':\n{interaction_list}\n\nPlease use 'edit interaction [ID]' to specify which interaction to edit."
         
-        # Update the single matching interaction
-        interaction = interactions[0]
+        # Update the single matching interaction; read what the reply needs before
+        # the commit expires it
+        interaction_id, hcp_name = interactions[0].id, interactions[0].hcp_name
         
         # Update fields if provided
-        if interaction_date:
-            interaction.interaction_date = parse_date_flexibly(interaction_date)
-        if interaction_time:
-            interaction.interaction_time = interaction_time
-        if interaction_type:
-            interaction.interaction_type = interaction_type
-        if attendees:
-            interaction.attendees = attendees
-        if summary:
-            interaction.summary = summary
-        if key_discussion_points:
-            interaction.key_discussion_points = key_discussion_points
-        if materials_shared:
-            interaction.materials_shared = materials_shared
-        if samples_distributed:
-            interaction.samples_distributed = samples_distributed
-        if sentiment:
-            interaction.sentiment = sentiment
-        if follow_up_actions:
-            interaction.follow_up_actions = follow_up_actions
+        update_interaction_fields(
+            db, interaction_id, interaction_date, interaction_time,
+            interaction_type=interaction_type,
+            attendees=attendees,
+            summary=summary,
+            key_discussion_points=key_discussion_points,
+            materials_shared=materials_shared,
+            samples_distributed=samples_distributed,
+            sentiment=sentiment,
+            follow_up_actions=follow_up_actions,
+        )
         
         db.commit()
-        return f"✅ Successfully updated interaction for {interaction.hcp_name} (ID {interaction.id})"
+        return f"✅ Successfully updated interaction for {hcp_name} (ID {interaction_id})"
     except Exception as e:
         db.rollback()
         return f"❌ Error updating interaction: {str(e)}"
     finally:
         db.close()
 
+# PUT field names -> frontend form field (must match frontend exactly)
+_FORM_FIELD_MAPPING = {
+    # Primary field mappings
+    'sentiment': 'hcpSentiment',
+    'interaction_type': 'interactionType',
+    'summary': 'outcomes',
+    'key_discussion_points': 'topicsDiscussed',
+    'materials_shared': 'materialsShared',
+    'samples_distributed': 'samplesDistributed',
+    'follow_up_actions': 'followUpActions',
+    'attendees': 'attendees',
+    'date': 'date',
+    'time': 'time',
+    'hcp_name': 'hcpName',
+    
+    # Alternative field names (for different PUT command variations)
+    'materials': 'materialsShared',
+    'samples': 'samplesDistributed',
+    'follow_up': 'followUpActions',
+    'topics': 'topicsDiscussed',
+    'discussion': 'topicsDiscussed',
+    'outcomes': 'outcomes',
+    'results': 'outcomes',
+    'type': 'interactionType',
+    'interaction_date': 'date',
+    'interaction_time': 'time',
+    'name': 'hcpName',
+    'doctor': 'hcpName',
+    'hcp': 'hcpName',
+    
+    # Sentiment variations
+    'feeling': 'hcpSentiment',
+    'mood': 'hcpSentiment',
+    'reaction': 'hcpSentiment',
+    
+    # Date/time variations
+    'when': 'date',
+    'meeting_date': 'date',
+    'meeting_time': 'time'
+}
+
+# Value normalization for the select fields (must match frontend exactly)
+_FORM_SENTIMENT_VALUES = {
+    'positive': 'Positive', 'good': 'Positive', 'happy': 'Positive',
+    'pleased': 'Positive', 'satisfied': 'Positive',
+    'neutral': 'Neutral', 'okay': 'Neutral', 'fine': 'Neutral', 'average': 'Neutral',
+    'negative': 'Negative', 'bad': 'Negative', 'unhappy': 'Negative',
+    'dissatisfied': 'Negative', 'concerned': 'Negative'
+}
+_FORM_TYPE_VALUES = {
+    'meeting': 'Meeting', 'call': 'Call', 'phone': 'Call',
+    'email': 'Email', 'visit': 'Visit', 'conference': 'Conference', 'other': 'Other'
+}
+
 @tool
 def update_form_field(field_name: str, field_value: str) -> str:
     """
@@ -543,82 +663,42 @@ def update_form_field(field_name: str, field_value: str) -> str:
     materials_shared, samples_distributed, follow_up_actions, attendees, date, time, hcp_name
     """
     try:
-        # Field mapping and normalization (must match frontend exactly)
-        field_mapping = {
-            # Primary field mappings
-            'sentiment': 'hcpSentiment',
-            'interaction_type': 'interactionType',
-            'summary': 'outcomes',
-            'key_discussion_points': 'topicsDiscussed',
-            'materials_shared': 'materialsShared',
-            'samples_distributed': 'samplesDistributed',
-            'follow_up_actions': 'followUpActions',
-            'attendees': 'attendees',
-            'date': 'date',
-            'time': 'time',
-            'hcp_name': 'hcpName',
-            
-            # Alternative field names (for different PUT command variations)
-            'materials': 'materialsShared',
-            'samples': 'samplesDistributed',
-            'follow_up': 'followUpActions',
-            'topics': 'topicsDiscussed',
-            'discussion': 'topicsDiscussed',
-            'outcomes': 'outcomes',
-            'results': 'outcomes',
-            'type': 'interactionType',
-            'interaction_date': 'date',
-            'interaction_time': 'time',
-            'name': 'hcpName',
-            'doctor': 'hcpName',
-            'hcp': 'hcpName',
-            
-            # Sentiment variations
-            'feeling': 'hcpSentiment',
-            'mood': 'hcpSentiment',
-            'reaction': 'hcpSentiment',
-            
-            # Date/time variations
-            'when': 'date',
-            'meeting_date': 'date',
-            'meeting_time': 'time'
-        }
-        
         # Handle both space-separated and underscore-separated field names
         field_key = field_name.lower()
-        form_field = field_mapping.get(field_key, field_mapping.get(field_key.replace(' ', '_'), field_name))
+        form_field = _FORM_FIELD_MAPPING.get(field_key, _FORM_FIELD_MAPPING.get(field_key.replace(' ', '_'), field_name))
         
         # Normalize values (must match frontend exactly)
         if form_field == 'hcpSentiment':
-            sentiment_map = {
-                'positive': 'Positive', 'good': 'Positive', 'happy': 'Positive',
-                'pleased': 'Positive', 'satisfied': 'Positive',
-                'neutral': 'Neutral', 'okay': 'Neutral', 'fine': 'Neutral', 'average': 'Neutral',
-                'negative': 'Negative', 'bad': 'Negative', 'unhappy': 'Negative',
-                'dissatisfied': 'Negative', 'concerned': 'Negative'
-            }
-            field_value = sentiment_map.get(field_value.lower(), field_value)
+            field_value = _FORM_SENTIMENT_VALUES.get(field_value.lower(), field_value)
         
         if form_field == 'interactionType':
-            type_map = {
-                'meeting': 'Meeting', 'call': 'Call', 'phone': 'Call',
-                'email': 'Email', 'visit': 'Visit', 'conference': 'Conference', 'other': 'Other'
-            }
-            field_value = type_map.get(field_value.lower(), field_value)
+            field_value = _FORM_TYPE_VALUES.get(field_value.lower(), field_value)
         
-        return json.dumps({
+        return orjson.dumps({
             "field": form_field,
             "value": field_value,
             "response_type": "FORM_UPDATE",
             "message": f"✅ Updated {field_name} to '{field_value}'"
-        })
+        }).decode()
         
     except Exception as e:
-        return json.dumps({
+        return orjson.dumps({
             "error": f"Error updating form field: {str(e)}",
             "response_type": "ERROR",
             "message": "❌ Error updating form field"
-        })
+        }).decode()
+
+def _hcp_name_condition(hcp_name: str):
+    """
+    Case-insensitive substring match on hcp_name, served by the trigram index on PostgreSQL.
+    "Dr. LastName" matches on the last name alone, which every "Dr. LastName" match contains anyway.
+    """
+    term = hcp_name
+    if hcp_name.startswith("Dr. ") and len(hcp_name.split()) == 2:
+        term = hcp_name.split()[1]
+    return models.Interaction.hcp_name.ilike(f"%{term}%")
+
+_format_history_row = "📅 {} | 📞 {} | 😊 {} | 📝 {}...".format
 
 @tool
 def get_interaction_history(hcp_name: str) -> str:
@@ -630,95 +710,52 @@ def get_interaction_history(hcp_name: str) -> str:
     """
     db = get_db_session()
     try:
-        # Improve search logic for better HCP name matching
-        search_terms = [hcp_name]
-        
-        # If searching for "Dr. LastName", also try just "LastName"
-        if hcp_name.startswith("Dr. ") and len(hcp_name.split()) == 2:
-            last_name = hcp_name.split()[1]
-            search_terms.append(last_name)
-        
-        # Try each search term until we find matches
-        interactions = []
-        for term in search_terms:
-            interactions = db.query(models.Interaction).filter(
-                models.Interaction.hcp_name.ilike(f"%{term}%")
-            ).order_by(models.Interaction.interaction_date.desc()).all()
-            if interactions:
-                break
+        # One query; "Dr. LastName" also finds interactions logged under just the last name
+        interactions = db.query(models.Interaction).options(load_only(
+            models.Interaction.interaction_at,
+            models.Interaction.interaction_type,
+            models.Interaction.sentiment,
+            models.Interaction.summary,
+        )).filter(
+            _hcp_name_condition(hcp_name)
+        ).order_by(models.Interaction.interaction_at.desc()).all()
         
         if not interactions:
             return f"No interactions found for {hcp_name}."
         
-        results = []
-        for interaction in interactions:
-            results.append(
-                f"📅 {interaction.interaction_date} | 📞 {interaction.interaction_type} | "
-                f"😊 {interaction.sentiment} | 📝 {interaction.summary[:100]}..."
-            )
-        
-        return f"📋 Interaction history for {hcp_name} ({len(interactions)} interactions):\n\n" + "\n".join(results)
+        # Header, blank line, then one row per interaction, joined once
+        lines = [f"📋 Interaction history for {hcp_name} ({len(interactions)} interactions):", ""]
+        lines.extend(
+            _format_history_row(interaction.interaction_date, interaction.interaction_type,
+                                interaction.sentiment, (interaction.summary or "")[:100])
+            for interaction in interactions
+        )
+        return "\n".join(lines)
     except Exception as e:
         return f"❌ Error retrieving interaction history: {str(e)}"
     finally:
         db.close()
 
-@tool
-def generate_sales_insights(hcp_name: str = "", period_days: int = 30) -> str:
-    """
-    Tool 5: Generate Sales Insights
-    
-    Uses LLM to generate strategic sales insights and recommendations based on interaction data.
-    Can analyze a specific HCP or provide overall sales pipeline insights.
-    """
-    db = get_db_session()
-    try:
-        # Build query based on parameters with improved search logic
-        query = db.query(models.Interaction)
-        if hcp_name:
-            # Try multiple search terms for better matching
-            search_terms = [hcp_name]
-            
-            # If searching for "Dr. LastName", also try just "LastName"
-            if hcp_name.startswith("Dr. ") and len(hcp_name.split()) == 2:
-                last_name = hcp_name.split()[1]
-                search_terms.append(last_name)
-            
-            # Use OR conditions for multiple search terms
-            from sqlalchemy import or_
-            conditions = [models.Interaction.hcp_name.ilike(f"%{term}%") for term in search_terms]
-            query = query.filter(or_(*conditions))
-        
-        # Filter by time period
-        cutoff_date = datetime.now().date() - timedelta(days=period_days)
-        interactions = query.filter(models.Interaction.interaction_date >= cutoff_date).all()
-        
-        if not interactions:
-            target = hcp_name if hcp_name else "your sales activities"
-            return f"No recent interactions found for {target} in the last {period_days} days."
-        
-        # Prepare data for LLM analysis
-        interaction_data = []
-        for interaction in interactions:
-            interaction_data.append({
-                'hcp_name': interaction.hcp_name,
-                'date': str(interaction.interaction_date),
-                'type': interaction.interaction_type,
-                'summary': interaction.summary,
-                'sentiment': interaction.sentiment
-            })
-        
-        llm = get_llm()
-        
-        insights_prompt = f"""
+# Raw interactions sent to the insights LLM alongside the aggregates
+_INSIGHT_RECENT_LIMIT = 20
+_INSIGHT_TOP_HCP_LIMIT = 10
+
+# Sales-insights prompt, filled per call with the target and the aggregates from _load_insight_data
+_INSIGHTS_PROMPT = """
         Analyze the following sales interaction data and provide strategic insights:
         
-        Target: {hcp_name if hcp_name else 'Overall Sales Pipeline'}
+        Target: {target}
         Period: Last {period_days} days
-        Total Interactions: {len(interactions)}
+        Total Interactions: {total}
+        
+        Interactions by Sentiment:
+        {sentiment_counts}
+        
+        Most Active HCPs (interaction count):
+        {top_hcps}
         
-        Interaction Data:
-        {json.dumps(interaction_data, indent=2)}
+        Most Recent Interactions (up to {recent_limit}):
+        {recent_interactions}
         
         Provide analysis in JSON format with these fields:
         - engagement_summary: Overall engagement assessment
@@ -730,8 +767,83 @@ def generate_sales_insights(hcp_name: str = "", period_days: int = 30) -> str:
         
         Return only valid JSON format.
         """
+
+def _load_insight_data(hcp_name: str, period_days: int) -> Dict[str, Any]:
+    """
+    Aggregates for the insights prompt over the period (optionally for one HCP): counts are
+    computed by the database, and only the most recent interactions are loaded as rows
+    """
+    cutoff = models.interaction_timestamp(datetime.now().date() - timedelta(days=period_days))
+    conditions = [models.Interaction.interaction_at >= cutoff]
+    if hcp_name:
+        conditions.append(_hcp_name_condition(hcp_name))
+    
+    db = get_db_session()
+    try:
+        sentiment_counts = {
+            sentiment or "Unspecified": count
+            for sentiment, count in db.query(models.Interaction.sentiment, func.count())
+            .filter(*conditions).group_by(models.Interaction.sentiment)
+        }
+        interaction_count = func.count().label("interaction_count")
+        top_hcps = {
+            name: count
+            for name, count in db.query(models.Interaction.hcp_name, interaction_count)
+            .filter(*conditions).group_by(models.Interaction.hcp_name)
+            .order_by(interaction_count.desc()).limit(_INSIGHT_TOP_HCP_LIMIT)
+        }
+        recent = db.query(models.Interaction).options(load_only(
+            models.Interaction.hcp_name,
+            models.Interaction.interaction_at,
+            models.Interaction.interaction_type,
+            models.Interaction.summary,
+            models.Interaction.sentiment,
+        )).filter(*conditions).order_by(models.Interaction.interaction_at.desc()).limit(_INSIGHT_RECENT_LIMIT)
         
-        response = llm.invoke(insights_prompt)
+        return {
+            'total': sum(sentiment_counts.values()),
+            'sentiment_counts': sentiment_counts,
+            'top_hcps': top_hcps,
+            'recent_interactions': [{
+                'hcp_name': interaction.hcp_name,
+                'date': str(interaction.interaction_date),
+                'type': interaction.interaction_type,
+                'summary': interaction.summary,
+                'sentiment': interaction.sentiment
+            } for interaction in recent],
+        }
+    finally:
+        db.close()
+
+@tool
+async def generate_sales_insights(hcp_name: str = "", period_days: int = 30) -> str:
+    """
+    Tool 5: Generate Sales Insights
+    
+    Uses LLM to generate strategic sales insights and recommendations based on interaction data.
+    Can analyze a specific HCP or provide overall sales pipeline insights.
+    """
+    try:
+        # The queries are blocking; only the LLM call below runs on the event loop
+        insight_data = await asyncio.to_thread(_load_insight_data, hcp_name, period_days)
+        
+        if not insight_data['total']:
+            target = hcp_name if hcp_name else "your sales activities"
+            return f"No recent interactions found for {target} in the last {period_days} days."
+        
+        llm = get_llm()
+        
+        insights_prompt = _INSIGHTS_PROMPT.format(
+            target=hcp_name if hcp_name else 'Overall Sales Pipeline',
+            period_days=period_days,
+            total=insight_data['total'],
+            sentiment_counts=json.dumps(insight_data['sentiment_counts']),
+            top_hcps=json.dumps(insight_data['top_hcps']),
+            recent_limit=_INSIGHT_RECENT_LIMIT,
+            recent_interactions=json.dumps(insight_data['recent_interactions'], indent=2),
+        )
+        
+        response = await llm.ainvoke(insights_prompt)
         content = response.content.strip()
         
         # Clean the response to extract JSON
@@ -740,7 +852,7 @@ def generate_sales_insights(hcp_name: str = "", period_days: int = 30) -> str:
         elif content.startswith("```"):
             content = content[3:-3]
         
-        insights_data = json.loads(content)
+        insights_data = _parse_json_reply(content)
         
         # Format the result for display
         target_label = hcp_name if hcp_name else "Sales Pipeline"
@@ -764,11 +876,59 @@ def generate_sales_insights(hcp_name: str = "", period_days: int = 30) -> str:
         
     except Exception as e:
         return f"❌ Error generating sales insights: {str(e)}"
-    finally:
-        db.close()
+
+# Form fields summarized by form_information_tool, in display order, with the prefix
+# of each summary line (the sentiment line also gets an emoji from _SENTIMENT_EMOJI)
+_FORM_FIELD_LABELS = {
+    'hcpName': "👤 HCP: ",
+    'interactionType': "📞 Type: ",
+    'date': "📅 Date: ",
+    'time': "⏰ Time: ",
+    'attendees': "👥 Attendees: ",
+    'topicsDiscussed': "💬 Topics: ",
+    'materialsShared': "📄 Materials: ",
+    'samplesDistributed': "🧪 Samples: ",
+    'hcpSentiment': " Sentiment: ",
+    'outcomes': "🎯 Outcomes: ",
+    'followUpActions': "📋 Follow-up: ",
+}
+_FORM_SUMMARY_FIELDS = tuple(_FORM_FIELD_LABELS)
+# Listed as "Not specified" when empty; other empty fields are left out
+_FORM_ALWAYS_SHOWN_FIELDS = frozenset({'hcpName', 'interactionType', 'date', 'time'})
+# Free-text fields clipped by _truncate
+_FORM_TRUNCATED_FIELDS = frozenset({'topicsDiscussed', 'outcomes', 'followUpActions'})
+# One bit per summary field, so filled and required counts are popcounts of a mask
+_FORM_FIELD_BITS = {field: 1 << i for i, field in enumerate(_FORM_SUMMARY_FIELDS)}
+# Fields required for submission
+_FORM_REQUIRED_MASK = _FORM_FIELD_BITS['hcpName'] | _FORM_FIELD_BITS['interactionType'] | _FORM_FIELD_BITS['date']
+_FORM_REQUIRED_COUNT = bin(_FORM_REQUIRED_MASK).count('1')
+# Real form payloads are a few hundred bytes; anything far larger isn't worth parsing
+_FORM_DATA_MAX_CHARS = 16384
+# Anything else (i.e. "Negative") falls back to 😞
+_SENTIMENT_EMOJI = {'Positive': '😊', 'Neutral': '😐'}
+
+_FORM_VERDICTS = (
+    "❌ Form needs more information before submission",
+    "⚠️ Form is mostly complete - consider adding more details",
+    "✅ Form is ready for submission!",
+)
+_FORM_TEMPLATE = (
+    "📋 **Current Form Summary**\n"
+    "\n"
+    "{details}\n"
+    "\n"
+    "📊 **Form Status:**\n"
+    "• Required fields completed: {filled_required}/{required_total} ({completeness:.0f}%)\n"
+    "• Total fields filled: {filled_fields}/{fields_total}\n"
+    "{verdict}"
+)
+
+def _truncate(text: str, limit: int = 100) -> str:
+    """Clip long free-text fields for the summary, leaving short ones uncopied"""
+    return text if len(text) <= limit else f"{text[:limit]}..."
 
 @tool
-def form_information_tool(form_data: str) -> str:
+def form_information_tool(form_data: str, return_format: Literal["text", "json"] = "text") -> str:
     """
     Tool 6: Form Information Tool
     
@@ -777,98 +937,74 @@ def form_information_tool(form_data: str) -> str:
     filled in the HCP interaction form and can provide insights or summaries.
     
     The form_data parameter should contain the current form state as JSON string.
+    With return_format="json" the summary is a JSON object (fields, required_filled,
+    filled, ready) instead of formatted text.
     """
+    if form_data and len(form_data) > _FORM_DATA_MAX_CHARS:
+        return "❌ Error: Form payload too large."
+    return _summarize_form(form_data, return_format)
+
+# The form is usually unchanged across several chat turns, so repeat summaries of
+# the same JSON come from the cache
+@lru_cache(maxsize=64)
+def _summarize_form(form_data: str, return_format: str = "text") -> str:
+    """Render the form summary behind form_information_tool"""
     try:
         # Parse the form data
-        form_info = json.loads(form_data) if form_data else {}
-        
-        # Extract form fields
-        hcp_name = form_info.get('hcpName', '').strip()
-        interaction_type = form_info.get('interactionType', '').strip()
-        date = form_info.get('date', '').strip()
-        time = form_info.get('time', '').strip()
-        attendees = form_info.get('attendees', '').strip()
-        topics_discussed = form_info.get('topicsDiscussed', '').strip()
-        materials_shared = form_info.get('materialsShared', '').strip()
-        samples_distributed = form_info.get('samplesDistributed', '').strip()
-        hcp_sentiment = form_info.get('hcpSentiment', '').strip()
-        outcomes = form_info.get('outcomes', '').strip()
-        follow_up_actions = form_info.get('followUpActions', '').strip()
-        
-        # Create a comprehensive summary
-        summary_parts = []
-        
-        # Basic interaction details
-        if hcp_name:
-            summary_parts.append(f"👤 HCP: {hcp_name}")
-        else:
-            summary_parts.append("👤 HCP: Not specified")
-        
-        if interaction_type:
-            summary_parts.append(f"📞 Type: {interaction_type}")
-        else:
-            summary_parts.append("📞 Type: Not specified")
-        
-        if date:
-            summary_parts.append(f"📅 Date: {date}")
-        else:
-            summary_parts.append("📅 Date: Not specified")
-        
-        if time:
-            summary_parts.append(f"⏰ Time: {time}")
-        else:
-            summary_parts.append("⏰ Time: Not specified")
-        
-        # Additional details
-        if attendees:
-            summary_parts.append(f"👥 Attendees: {attendees}")
-        
-        if topics_discussed:
-            summary_parts.append(f"💬 Topics: {topics_discussed[:100]}{'...' if len(topics_discussed) > 100 else ''}")
-        
-        if materials_shared:
-            summary_parts.append(f"📄 Materials: {materials_shared}")
-        
-        if samples_distributed:
-            summary_parts.append(f"🧪 Samples: {samples_distributed}")
-        
-        if hcp_sentiment:
-            sentiment_emoji = "😊" if hcp_sentiment == "Positive" else "😐" if hcp_sentiment == "Neutral" else "😞"
-            summary_parts.append(f"{sentiment_emoji} Sentiment: {hcp_sentiment}")
-        
-        if outcomes:
-            summary_parts.append(f"🎯 Outcomes: {outcomes[:100]}{'...' if len(outcomes) > 100 else ''}")
-        
-        if follow_up_actions:
-            summary_parts.append(f"📋 Follow-up: {follow_up_actions[:100]}{'...' if len(follow_up_actions) > 100 else ''}")
+        form_info = orjson.loads(form_data) if form_data else {}
+        if not isinstance(form_info, dict):
+            return "❌ Error: Invalid form data format. Please provide a JSON object."
+        
+        # Extract form fields, marking filled ones in the same pass
+        get = form_info.get
+        fields = {}
+        filled_mask = 0
+        for field, bit in _FORM_FIELD_BITS.items():
+            value = get(field)
+            # Empty and missing fields skip the no-op strip()
+            value = value.strip() if value else ''
+            fields[field] = value
+            if value:
+                filled_mask |= bit
+        # bin().count() rather than int.bit_count(), which needs Python 3.10
+        filled_count = bin(filled_mask).count('1')
+        filled_required = bin(filled_mask & _FORM_REQUIRED_MASK).count('1')
+        
+        if return_format == "json":
+            return orjson.dumps({
+                "fields": fields,
+                "required_filled": filled_required,
+                "filled": filled_count,
+                "ready": filled_required == _FORM_REQUIRED_COUNT,
+            }).decode()
+        
+        # Detail lines are collected here and joined once into the template
+        out = []
+        for field, value in fields.items():
+            if value:
+                if field in _FORM_TRUNCATED_FIELDS:
+                    value = _truncate(value)
+                elif field == 'hcpSentiment':
+                    out.append(_SENTIMENT_EMOJI.get(value, '😞') + _FORM_FIELD_LABELS[field] + value)
+                    continue
+                out.append(_FORM_FIELD_LABELS[field] + value)
+            elif field in _FORM_ALWAYS_SHOWN_FIELDS:
+                out.append(_FORM_FIELD_LABELS[field] + "Not specified")
         
         # Check completeness
-        required_fields = ['hcpName', 'interactionType', 'date']
-        filled_required = sum(1 for field in required_fields if form_info.get(field, '').strip())
-        completeness = (filled_required / len(required_fields)) * 100
-        
-        # Count total filled fields
-        all_fields = ['hcpName', 'interactionType', 'date', 'time', 'attendees', 'topicsDiscussed', 
-                     'materialsShared', 'samplesDistributed', 'hcpSentiment', 'outcomes', 'followUpActions']
-        filled_fields = sum(1 for field in all_fields if form_info.get(field, '').strip())
-        
-        # Create final summary
-        result = "📋 **Current Form Summary**\n\n"
-        result += "\n".join(summary_parts)
-        result += f"\n\n📊 **Form Status:**\n"
-        result += f"• Required fields completed: {filled_required}/{len(required_fields)} ({completeness:.0f}%)\n"
-        result += f"• Total fields filled: {filled_fields}/{len(all_fields)}\n"
-        
-        if completeness >= 100:
-            result += f"✅ Form is ready for submission!"
-        elif completeness >= 66:
-            result += f"⚠️ Form is mostly complete - consider adding more details"
-        else:
-            result += f"❌ Form needs more information before submission"
-        
-        return result
+        completeness = (filled_required / _FORM_REQUIRED_COUNT) * 100
+        
+        return _FORM_TEMPLATE.format(
+            details="\n".join(out),
+            filled_required=filled_required,
+            required_total=_FORM_REQUIRED_COUNT,
+            completeness=completeness,
+            filled_fields=filled_count,
+            fields_total=len(_FORM_SUMMARY_FIELDS),
+            verdict=_FORM_VERDICTS[0 if completeness < 66 else 1 if completeness < 100 else 2],
+        )
         
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return "❌ Error: Invalid form data format. Please provide valid JSON."
     except Exception as e:
         return f"❌ Error analyzing form: {str(e)}"
\ No newline at end of file
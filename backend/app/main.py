@@ -1,21 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from langchain_core.messages import HumanMessage
 from .api.v1 import endpoints
 from .db.database import engine
 from .db import models
-from .core.config import settings
+from .core.config import Settings, get_settings
+from .langgraph_agent.agent import app as langgraph_app
+from .langgraph_agent.tools import get_llm
 
-print("🚀 Starting AI-First CRM HCP Module Backend...")
-print(f"🔧 Database URL: {settings.database_url}")
-print(f"🤖 Groq API Key configured: {'Yes' if settings.groq_api_key else 'No'}")
+logger = logging.getLogger(__name__)
 
-# Create database tables
-try:
-    models.Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully")
-except Exception as e:
-    print(f"❌ Error creating database tables: {e}")
-    raise
+logger.info("🚀 Starting AI-First CRM HCP Module Backend...")
+
+# Create database tables (opt-in; deployed databases are expected to have the schema)
+if get_settings().auto_create_tables:
+    try:
+        models.Base.metadata.create_all(bind=engine)
+        logger.info("✅ Database tables created successfully")
+    except Exception as e:
+        logger.error("❌ Error creating database tables: %s", e)
+        raise
 
 app = FastAPI(
     title="AI-First CRM HCP Module",
@@ -36,26 +43,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# The compiled graph is built once at import and shared from app.state
+app.state.langgraph_app = langgraph_app
+
 app.include_router(endpoints.router, prefix="/api/v1")
 
 @app.on_event("startup")
 async def startup_event():
     """Test LangGraph agent on startup"""
-    print("🔄 Testing LangGraph Agent initialization...")
     try:
-        from .langgraph_agent.agent import app as langgraph_app
-        from langchain_core.messages import HumanMessage
-        
+        # Build the tools' shared Groq client now, so a missing key shows up at startup
+        # rather than on the first tool call
+        get_llm()
+    except Exception as e:
+        logger.warning("⚠️  Tool LLM initialization warning: %s", e)
+    
+    # The test round-trip goes to Groq, so run it in the background rather than
+    # holding up the server from accepting requests; keep a reference so the task
+    # isn't garbage collected mid-flight
+    app.state.agent_warmup = asyncio.create_task(_warm_up_agent())
+
+async def _warm_up_agent():
+    """Send the LangGraph agent a test message and report whether it answered"""
+    logger.info("🔄 Testing LangGraph Agent initialization...")
+    try:
         # Test with a simple message
-        test_result = langgraph_app.invoke({"messages": [HumanMessage(content="Hello, I'm a test message")]})
-        print("✅ LangGraph Agent initialized and working!")
+        await app.state.langgraph_app.ainvoke({"messages": [HumanMessage(content="Hello, I'm a test message")]})
+        logger.info("✅ LangGraph Agent initialized and working!")
         
     except Exception as e:
-        print(f"⚠️  LangGraph Agent initialization warning: {e}")
-        print("   This is normal if GROQ_API_KEY is not set or database is not ready")
+        logger.warning(
+            "⚠️  LangGraph Agent initialization warning: %s "
+            "(this is normal if GROQ_API_KEY is not set or database is not ready)", e
+        )
 
 @app.get("/")
-async def root():
+async def root(settings: Settings = Depends(get_settings)):
     """Health check endpoint"""
     return {
         "message": "AI-First CRM HCP Module Backend is running!",
@@ -65,7 +88,7 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check():
+async def health_check(settings: Settings = Depends(get_settings)):
     """Detailed health check"""
     return {
         "database": "connected" if engine else "disconnected",
@@ -0,0 +1,47 @@
+-- Brings an interactions table created from the original schema up to date with
+-- app/db/models.py. PostgreSQL 12+ only; safe to run more than once:
+--
+--     psql "$DATABASE_URL" -f sql/upgrade_schema.sql
+
+BEGIN;
+
+-- interaction_date + interaction_time -> interaction_at (UTC timestamp)
+ALTER TABLE interactions ADD COLUMN IF NOT EXISTS interaction_at TIMESTAMPTZ;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'interactions' AND column_name = 'interaction_date'
+    ) THEN
+        -- The API always wrote HH:MM; anything else is treated as midnight, as a
+        -- missing time is
+        UPDATE interactions
+        SET interaction_at = (
+            interaction_date + CASE
+                WHEN interaction_time ~ '^([01]?[0-9]|2[0-3]):[0-5][0-9]$' THEN interaction_time::time
+                ELSE TIME '00:00'
+            END
+        ) AT TIME ZONE 'UTC'
+        WHERE interaction_at IS NULL;
+
+        -- Dropping the columns also drops their indexes
+        ALTER TABLE interactions DROP COLUMN interaction_date, DROP COLUMN interaction_time;
+    END IF;
+END
+$$;
+
+ALTER TABLE interactions ALTER COLUMN interaction_at SET NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_interactions_interaction_at ON interactions (interaction_at);
+
+-- Lowercased copy of hcp_name for the API's case-insensitive prefix search
+ALTER TABLE interactions
+    ADD COLUMN IF NOT EXISTS hcp_name_lc VARCHAR(255) GENERATED ALWAYS AS (lower(hcp_name)) STORED;
+CREATE INDEX IF NOT EXISTS ix_interactions_hcp_name_lc ON interactions (hcp_name_lc text_pattern_ops);
+
+-- Trigram index for the agent tools' ILIKE '%name%' lookups
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_interactions_hcp_name_trgm ON interactions USING gin (hcp_name gin_trgm_ops);
+
+COMMIT;